@@ -0,0 +1,402 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# SHARED HELPERS
+# =========================================================
+def day_numbers(dates):
+    # Datetime series → integer days since epoch, plus a mask of parseable dates
+    values = pd.to_datetime(dates, errors="coerce").values.astype("datetime64[D]")
+    mask = ~np.isnat(values)
+    days = np.where(mask, values.astype("int64"), 0)
+    return days, mask
+
+
+def month_numbers(dates):
+    # Datetime series → integer month index (year * 12 + month - 1)
+    values = pd.to_datetime(dates, errors="coerce").values.astype("datetime64[M]")
+    mask = ~np.isnat(values)
+    months = np.where(mask, values.astype("int64"), 0)
+    return months, mask
+
+
+def month_label(month_index):
+    return str(np.datetime64(int(month_index), "M"))
+
+
+# =========================================================
+# COHORT ENGINE (BATCH / LEAD MONTH)
+# =========================================================
+def cohort_keys(df, cohort_by="batch"):
+    # Returns integer cohort codes, labels and a validity mask
+    if cohort_by == "batch":
+        batch = df["batch"]
+        codes, labels = pd.factorize(batch.astype(str), sort=True)
+        return codes, np.asarray(labels, dtype=object), (codes >= 0) & batch.notna().to_numpy()
+
+    months, mask = month_numbers(df["lead_created_date"])
+    uniq = np.unique(months[mask])
+    codes = np.where(mask, np.searchsorted(uniq, months), -1)
+    labels = np.array([month_label(m) for m in uniq], dtype=object)
+    return codes, labels, mask
+
+
+def lead_to_payment_lag(df, cohort_by="batch", bucket_days=7, max_days=180):
+    # Distribution of days from lead creation to first payment per cohort.
+    # Built with a single bincount over (cohort, lag bucket) pairs.
+    codes, labels, mask = cohort_keys(df, cohort_by)
+    lead_days, lead_ok = day_numbers(df["lead_created_date"])
+    pay_days, pay_ok = day_numbers(df["first_payment_date"])
+
+    lag = pay_days - lead_days
+    valid = mask & lead_ok & pay_ok & (lag >= 0)
+    lag = lag[valid]
+    codes = codes[valid]
+
+    n_buckets = int(np.ceil(max_days / bucket_days))
+    bucket = np.minimum(lag // bucket_days, n_buckets)
+    n_cols = n_buckets + 1
+
+    flat = codes * n_cols + bucket
+    counts = np.bincount(flat, minlength=len(labels) * n_cols).reshape(len(labels), n_cols)
+
+    bucket_labels = [f"{i * bucket_days}–{(i + 1) * bucket_days - 1}d" for i in range(n_buckets)]
+    bucket_labels.append(f"{n_buckets * bucket_days}d+")
+    dist = pd.DataFrame(counts, index=pd.Index(labels, name="cohort"), columns=bucket_labels)
+
+    # Per-cohort summary (weighted bincounts → no groupby)
+    students = counts.sum(axis=1)
+    lag_sum = np.bincount(codes, weights=lag, minlength=len(labels))
+    within_30 = np.bincount(codes, weights=(lag <= 30), minlength=len(labels))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary = pd.DataFrame({
+            "cohort": labels,
+            "Students": students,
+            "Avg Lag (days)": np.where(students > 0, lag_sum / students, np.nan),
+            "Paid ≤30d %": np.where(students > 0, within_30 / students * 100, np.nan),
+        })
+    return dist, summary
+
+
+def collection_curves(df, cohort_by="batch", max_months=24):
+    # Cumulative collections per cohort by months since the cohort's first enrollment.
+    # Share is of total_fee when available, otherwise of the cohort's own collections.
+    codes, labels, mask = cohort_keys(df, cohort_by)
+    pay_months, pay_ok = month_numbers(df["first_payment_date"])
+    valid = mask & pay_ok
+    codes = codes[valid]
+    pay_months = pay_months[valid]
+    collected = df["collected_amount"].to_numpy(dtype=float)[valid]
+
+    n_cohorts = len(labels)
+    start = np.full(n_cohorts, np.iinfo(np.int64).max)
+    np.minimum.at(start, codes, pay_months)
+
+    offset = np.minimum(pay_months - start[codes], max_months)
+    n_cols = max_months + 1
+    flat = codes * n_cols + offset
+    amounts = np.bincount(flat, weights=collected, minlength=n_cohorts * n_cols).reshape(n_cohorts, n_cols)
+    cumulative = np.cumsum(amounts, axis=1)
+
+    if "total_fee" in df.columns:
+        fee = df["total_fee"].to_numpy(dtype=float)[valid]
+        denom = np.bincount(codes, weights=fee, minlength=n_cohorts)
+    else:
+        denom = cumulative[:, -1]
+    denom = np.where(denom > 0, denom, np.nan)
+
+    curves = pd.DataFrame(
+        cumulative / denom[:, None] * 100,
+        index=pd.Index(labels, name="cohort"),
+        columns=[f"M{i}" for i in range(max_months)] + [f"M{max_months}+"]
+    )
+    return curves
+
+
+# =========================================================
+# RECEIVABLES AGING (PENDING AMOUNT)
+# =========================================================
+AGING_EDGES = np.array([31, 61, 91])
+AGING_LABELS = ["0–30 days", "31–60 days", "61–90 days", "90+ days"]
+
+
+def receivables_aging(df, as_of, by=None):
+    # Buckets pending_amount by days since first_payment_date as of a given date.
+    # Uses the precomputed integer payment_day column, so a new as-of date is one
+    # subtraction + digitize + bincount over the ledger.
+    as_of_day = np.datetime64(pd.Timestamp(as_of).date(), "D").astype("int64")
+    age = as_of_day - df["payment_day"].to_numpy()
+    pending = df["pending_amount"].to_numpy(dtype=float)
+
+    if by is None:
+        codes = np.zeros(len(age), dtype=np.int64)
+        labels = np.array(["All"], dtype=object)
+    else:
+        codes, labels = pd.factorize(df[by].fillna("Unassigned").astype(str), sort=True)
+        labels = np.asarray(labels, dtype=object)
+
+    valid = (age >= 0) & (pending > 0)
+    age = age[valid]
+    pending = pending[valid]
+    codes = codes[valid]
+    bucket = np.digitize(age, AGING_EDGES)
+    n_cols = len(AGING_LABELS)
+
+    flat = codes * n_cols + bucket
+    amounts = np.bincount(flat, weights=pending, minlength=len(labels) * n_cols).reshape(len(labels), n_cols)
+
+    aging = pd.DataFrame(amounts, columns=AGING_LABELS)
+    aging.insert(0, by or "Scope", labels)
+    aging["Total Pending (₹)"] = amounts.sum(axis=1)
+    return aging.sort_values("Total Pending (₹)", ascending=False).reset_index(drop=True)
+
+
+# =========================================================
+# SALES-OWNER (CO_ASSIGNEE) LEADERBOARD
+# =========================================================
+JOINED_VALUES = {"yes", "y", "1", "true", "joined", "paid", "converted"}
+
+LEADERBOARD_METRICS = {
+    "Collected Revenue (₹)": "collected",
+    "Pending Amount (₹)": "pending",
+    "Conversion %": "conversion",
+    "Average Deal Size (₹)": "avg_deal",
+}
+
+
+def converted_flags(df):
+    # joined_or_not when present, otherwise "paid something"
+    if "joined_or_not" in df.columns:
+        return df["joined_or_not"].astype(str).str.strip().str.lower().isin(JOINED_VALUES).to_numpy()
+    return df["collected_amount"].to_numpy(dtype=float) > 0
+
+
+def assignee_month_cube(df):
+    # One pass over the ledger → (owner × month) matrices of the additive measures.
+    # Every leaderboard view (metric, period, k) is derived from this small cube.
+    owner_codes, owners = pd.factorize(df["co_assignee"].fillna("Unassigned").astype(str), sort=True)
+    months, _ = month_numbers(df["first_payment_date"])
+    month_index = np.unique(months)
+    month_codes = np.searchsorted(month_index, months)
+
+    n_owners, n_months = len(owners), len(month_index)
+    flat = owner_codes * n_months + month_codes
+    size = n_owners * n_months
+
+    def _sum(weights=None):
+        return np.bincount(flat, weights=weights, minlength=size).reshape(n_owners, n_months)
+
+    pending = df["pending_amount"].to_numpy(dtype=float) if "pending_amount" in df.columns else None
+    converted = converted_flags(df)
+
+    return {
+        "owners": np.asarray(owners, dtype=object),
+        "months": [month_label(m) for m in month_index],
+        "leads": _sum(),
+        "converted": _sum(converted.astype(float)),
+        "paying": _sum((df["collected_amount"].to_numpy(dtype=float) > 0).astype(float)),
+        "collected": _sum(df["collected_amount"].to_numpy(dtype=float)),
+        "pending": _sum(pending) if pending is not None else np.zeros((n_owners, n_months)),
+    }
+
+
+def leaderboard(cube, metric="Collected Revenue (₹)", k=20, month_start=0, month_end=None):
+    # Re-rank for a period (month index slice) with argpartition top-k, then sort only k rows
+    sl = slice(month_start, None if month_end is None else month_end + 1)
+    leads = cube["leads"][:, sl].sum(axis=1)
+    converted = cube["converted"][:, sl].sum(axis=1)
+    paying = cube["paying"][:, sl].sum(axis=1)
+    collected = cube["collected"][:, sl].sum(axis=1)
+    pending = cube["pending"][:, sl].sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = {
+            "collected": collected,
+            "pending": pending,
+            "conversion": np.where(leads > 0, converted / leads * 100, np.nan),
+            "avg_deal": np.where(paying > 0, collected / paying, np.nan),
+        }
+
+    active = np.flatnonzero(leads > 0)
+    score = np.nan_to_num(values[LEADERBOARD_METRICS[metric]][active], nan=-np.inf)
+    k = min(int(k), len(active))
+    if k == 0:
+        return pd.DataFrame(columns=["Rank", "co_assignee"] + list(LEADERBOARD_METRICS) + ["Leads"])
+
+    top = np.argpartition(-score, k - 1)[:k]
+    top = top[np.argsort(-score[top], kind="stable")]
+    idx = active[top]
+
+    return pd.DataFrame({
+        "Rank": np.arange(1, k + 1),
+        "co_assignee": cube["owners"][idx],
+        "Collected Revenue (₹)": values["collected"][idx],
+        "Pending Amount (₹)": values["pending"][idx],
+        "Conversion %": values["conversion"][idx],
+        "Average Deal Size (₹)": values["avg_deal"][idx],
+        "Leads": leads[idx],
+    })
+
+
+# =========================================================
+# ROLLING-WINDOW METRICS (CUMSUM WINDOW DIFFERENCES)
+# =========================================================
+# Window lengths per grain: TTM, 3-month MRR window, YoY lag
+ROLLING_WINDOWS = {
+    "Monthly": {"ttm": 12, "mrr": 3, "per_month": 1, "yoy": 12},
+    "Daily": {"ttm": 365, "mrr": 91, "per_month": 365 / 12, "yoy": 365},
+}
+
+
+def rolling_sum(values, window):
+    # O(n) for any window: difference of a single prefix-sum array
+    values = np.asarray(values, dtype=float)
+    window = int(window)
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    full = csum[window:] - csum[:-window] if window <= len(values) else np.array([])
+    return np.concatenate((np.full(min(window - 1, len(values)), np.nan), full))
+
+
+def lagged_growth(values, lag):
+    values = np.asarray(values, dtype=float)
+    prev = np.full(len(values), np.nan)
+    if lag < len(values):
+        prev[lag:] = values[:-lag]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prev > 0, (values / prev - 1) * 100, np.nan)
+
+
+def dense_revenue(df, grain="Monthly"):
+    # Revenue on a gap-free calendar (missing months/days → 0), via one bincount
+    if grain == "Daily":
+        idx = df["payment_day"].to_numpy()
+    else:
+        idx, _ = month_numbers(df["first_payment_date"])
+    if len(idx) == 0:
+        return pd.DataFrame({"period": [], "Revenue (₹)": []})
+
+    start = idx.min()
+    revenue = np.bincount(idx - start, weights=df["collected_amount"].to_numpy(dtype=float))
+    unit = "D" if grain == "Daily" else "M"
+    periods = np.arange(start, start + len(revenue)).astype(f"datetime64[{unit}]").astype(str)
+    return pd.DataFrame({"period": periods, "Revenue (₹)": revenue})
+
+
+def rolling_metrics(series, grain="Monthly", custom_window=None):
+    w = ROLLING_WINDOWS[grain]
+    revenue = series["Revenue (₹)"].to_numpy(dtype=float)
+
+    ttm = rolling_sum(revenue, w["ttm"])
+    mrr_window = rolling_sum(revenue, w["mrr"])
+    rolling_mrr = mrr_window / (w["mrr"] / w["per_month"])
+
+    out = series.copy()
+    out["TTM Revenue (₹)"] = ttm
+    out["Rolling MRR (₹)"] = rolling_mrr
+    out["Rolling ARR (₹)"] = rolling_mrr * 12
+    out["Rolling YoY %"] = lagged_growth(ttm, w["yoy"])
+    if custom_window:
+        out[f"Rolling {int(custom_window)}-Period Revenue (₹)"] = rolling_sum(revenue, custom_window)
+    return out
+
+
+# =========================================================
+# FISCAL CALENDAR (INTEGER PERIOD ARITHMETIC)
+# =========================================================
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+DEFAULT_FY_START = int(os.environ.get("FISCAL_YEAR_START_MONTH", "1"))
+
+
+def fiscal_keys(year, month, fy_start=1):
+    # Fiscal year is named by the calendar year it ends in (Apr 2024 – Mar 2025 → FY2025)
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    shift = (month - fy_start) % 12
+    fiscal_year = year + (month >= fy_start) if fy_start > 1 else year
+    return fiscal_year, shift // 3 + 1, shift + 1
+
+
+def month_rollup(df):
+    # (year, month) → revenue; every calendar/fiscal view is re-aggregated from this
+    return df.groupby(["year", "month"], sort=True)["collected_amount"].sum().reset_index()
+
+
+def fiscal_rollups(base, fy_start=1):
+    fy, fq, _ = fiscal_keys(base["year"], base["month"], fy_start)
+    revenue = base["collected_amount"].to_numpy(dtype=float)
+
+    monthly = pd.DataFrame({
+        "month_period": base["year"].astype(str) + "-" + base["month"].map("{:02d}".format),
+        "Revenue (₹)": revenue,
+    })
+
+    q = pd.DataFrame({"fy": fy, "fq": fq, "Revenue (₹)": revenue})
+    quarterly = q.groupby(["fy", "fq"], sort=True)["Revenue (₹)"].sum().reset_index()
+    yearly = q.groupby("fy", sort=True)["Revenue (₹)"].sum().reset_index()
+
+    if fy_start == 1:
+        quarterly.insert(0, "quarter_period", quarterly["fy"].astype(str) + "Q" + quarterly["fq"].astype(str))
+        yearly.insert(0, "year", yearly["fy"])
+    else:
+        quarterly.insert(0, "quarter_period", "FY" + quarterly["fy"].astype(str) + "-Q" + quarterly["fq"].astype(str))
+        yearly.insert(0, "year", "FY" + yearly["fy"].astype(str))
+
+    return (
+        monthly,
+        quarterly.drop(columns=["fy", "fq"]),
+        yearly.drop(columns=["fy"]),
+    )
+
+
+# =========================================================
+# INSTALLMENT (EMI) SCHEDULE → BILLED / COLLECTED / DEFERRED / MRR
+# =========================================================
+# Each student's total_fee is billed in n_emis equal installments every
+# frequency_months, starting in the month of first_payment_date. Fees are first
+# summed per start month (one bincount), then each installment is an offset
+# add of that vector, so the cost is O(students + n_emis × months).
+def emi_schedule(df, n_emis=3, frequency_months=1):
+    n_emis, frequency_months = max(int(n_emis), 1), max(int(frequency_months), 1)
+    # Months since 1970-01, the same index month_numbers / month_label use
+    start = (df["year"].to_numpy(dtype=np.int64) - 1970) * 12 + df["month"].to_numpy(dtype=np.int64) - 1
+    collected = df["collected_amount"].to_numpy(dtype=float)
+    if "total_fee" in df.columns:
+        fee = df["total_fee"].to_numpy(dtype=float)
+        fee = np.where(fee > 0, fee, collected)     # no fee recorded → the collected amount
+    else:
+        fee = collected
+    if len(start) == 0:
+        return pd.DataFrame(columns=[
+            "month_period", "Billed (₹)", "Collected (₹)", "Deferred Revenue (₹)", "Receivables (₹)",
+            "Active Schedules", "MRR (₹)", "ARR (₹)"
+        ])
+
+    first = start.min()
+    offset = start - first
+    span = int(offset.max()) + (n_emis - 1) * frequency_months + 1
+
+    per_start = np.bincount(offset, weights=fee / n_emis, minlength=span)
+    starts = np.bincount(offset, minlength=span)
+    billed = np.zeros(span)
+    active = np.zeros(span)
+    for k in range(n_emis):
+        shift = k * frequency_months
+        billed[shift:] += per_start[:span - shift]
+        active[shift:] += starts[:span - shift]
+
+    # Cash as recorded in the ledger: collected_amount lands in the first-payment month
+    cash = np.bincount(offset, weights=collected, minlength=span)
+    balance = np.cumsum(cash) - np.cumsum(billed)
+
+    return pd.DataFrame({
+        "month_period": [month_label(m) for m in range(first, first + span)],
+        "Billed (₹)": billed,
+        "Collected (₹)": cash,
+        "Deferred Revenue (₹)": np.maximum(balance, 0.0),
+        "Receivables (₹)": np.maximum(-balance, 0.0),
+        "Active Schedules": active.astype(np.int64),
+        "MRR (₹)": billed,
+        "ARR (₹)": billed * 12,
+    })
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import numpy as np
+import pandas as pd
+
+from analytics import month_rollup, fiscal_rollups
+from finance import MODE_A, PROJECTION_INPUTS, metric_block, runway, project, projection_table
+from scenarios import normalize_inputs
+
+# =========================================================
+# LOCAL JSON API (SAME ENGINES AS THE DASHBOARDS)
+# =========================================================
+# Run with:  python api.py --port 8600
+#
+#   GET  /health
+#   POST /metrics            {"revenue": x | [..], "mode": "A" | "B", "op_cost_pct", "opex_pct",
+#                             "reinvest_pct", "cash"}        (any numeric field may be an array)
+#   POST /projection         {<PROJECTION_INPUTS>}           → year-by-year table + outcome
+#   POST /projection/batch   {"scenarios": [{<PROJECTION_INPUTS>}, ...]}
+#                         or {"inputs": {<input>: [..] | x}} → outcome arrays, one value per scenario
+#   POST /rollups            {"first_payment_date": [..], "collected_amount": [..], "fy_start": 1}
+#
+# Requests are served by a fixed pool of worker threads over keep-alive
+# connections; batch endpoints evaluate all scenarios in one vectorized call.
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", "8600"))
+API_WORKERS = int(os.environ.get("API_WORKERS", "16"))
+MAX_BODY_BYTES = 64 * 1024 * 1024
+OUTCOME_KEYS = ["terminal_value", "payout", "roi", "irr", "payout_multiple", "dcf_value"]
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _jsonable(value):
+    # numpy → plain lists/floats; NaN/inf → null (strict JSON has no NaN)
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, pd.DataFrame):
+        return {c: _jsonable(value[c].to_numpy()) for c in value.columns}
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f":
+            out = value.astype(object)
+            out[~np.isfinite(value)] = None
+            return out.tolist()
+        return value.tolist()
+    if isinstance(value, (float, np.floating)):
+        return float(value) if np.isfinite(value) else None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _numeric(body, key, default=None):
+    value = body.get(key, default)
+    if value is None:
+        raise ApiError(f"Missing field: {key}")
+    try:
+        return np.asarray(value, dtype=float)
+    except (TypeError, ValueError):
+        raise ApiError(f"Field {key} must be a number or an array of numbers")
+
+
+# =========================================================
+# ENDPOINTS
+# =========================================================
+def metrics_endpoint(body):
+    assumptions = MODE_A if body.get("mode", "A") == "A" else {
+        k: _numeric(body, k) for k in ["op_cost_pct", "opex_pct", "reinvest_pct"]
+    }
+    block = metric_block(_numeric(body, "revenue"), **assumptions)
+    if "cash" in body:
+        block["runway"] = runway(_numeric(body, "cash"), block["burn_rate"])
+    return block
+
+
+def projection_endpoint(body):
+    try:
+        inputs = normalize_inputs(body)
+    except KeyError as e:
+        raise ApiError(f"Missing projection input: {e.args[0]}")
+    except (TypeError, ValueError):
+        raise ApiError("Projection inputs must be numbers")
+    if inputs["years"] < 1:
+        raise ApiError("years must be at least 1")
+    proj, summary = projection_table(**inputs)
+    return {"inputs": inputs, "projection": proj, "outcome": summary}
+
+
+def projection_batch_endpoint(body):
+    # Columnar arrays are evaluated as-is; a list of scenarios is transposed first.
+    # Scenarios are grouped by horizon (years), one vectorized call per group.
+    if "inputs" in body:
+        columns = body["inputs"]
+        missing = [k for k in PROJECTION_INPUTS if k not in columns]
+        if missing:
+            raise ApiError(f"Missing projection inputs: {', '.join(missing)}")
+        try:
+            arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(columns[k], dtype=float))
+                                           for k in PROJECTION_INPUTS])
+        except ValueError:
+            raise ApiError("Input arrays must be numbers of equal length (or scalars)")
+        cols = dict(zip(PROJECTION_INPUTS, arrays))
+    else:
+        scenarios = body.get("scenarios")
+        if not isinstance(scenarios, list) or not scenarios:
+            raise ApiError("Provide a non-empty 'scenarios' list or an 'inputs' object of arrays")
+        try:
+            cols = {k: np.array([s[k] for s in scenarios], dtype=float) for k in PROJECTION_INPUTS}
+        except KeyError as e:
+            raise ApiError(f"Missing projection input: {e.args[0]}")
+        except (TypeError, ValueError):
+            raise ApiError("Projection inputs must be numbers")
+
+    n = len(cols["years"])
+    years = cols["years"].astype(int)
+    if (years < 1).any():
+        raise ApiError("years must be at least 1")
+    out = {k: np.empty(n) for k in OUTCOME_KEYS}
+    for y in np.unique(years):
+        idx = np.flatnonzero(years == y)
+        res = project(**{k: (int(y) if k == "years" else cols[k][idx]) for k in PROJECTION_INPUTS})
+        for k in OUTCOME_KEYS:
+            out[k][idx] = res[k]
+    return {"count": n, "outcome": out}
+
+
+def rollups_endpoint(body):
+    try:
+        dates = pd.to_datetime(pd.Series(body["first_payment_date"]), errors="coerce")
+        amounts = pd.to_numeric(pd.Series(body["collected_amount"]), errors="coerce").fillna(0)
+    except KeyError as e:
+        raise ApiError(f"Missing field: {e.args[0]}")
+    if len(dates) != len(amounts):
+        raise ApiError("first_payment_date and collected_amount must have the same length")
+    fy_start = int(body.get("fy_start", 1))
+    if not 1 <= fy_start <= 12:
+        raise ApiError("fy_start must be a month number 1–12")
+
+    valid = dates.notna().to_numpy()
+    df = pd.DataFrame({
+        "year": dates[valid].dt.year.to_numpy(),
+        "month": dates[valid].dt.month.to_numpy(),
+        "collected_amount": amounts[valid].to_numpy(),
+    })
+    monthly, quarterly, yearly = fiscal_rollups(month_rollup(df), fy_start)
+
+    cagr = 0.0
+    if len(yearly) > 1:
+        beginning, ending = yearly["Revenue (₹)"].iloc[0], yearly["Revenue (₹)"].iloc[-1]
+        if beginning > 0:
+            cagr = (ending / beginning) ** (1 / (len(yearly) - 1)) - 1
+    return {
+        "rows_used": int(valid.sum()),
+        "rows_skipped": int((~valid).sum()),
+        "monthly": monthly,
+        "quarterly": quarterly,
+        "yearly": yearly,
+        "cagr": cagr,
+    }
+
+
+ROUTES = {
+    "/metrics": metrics_endpoint,
+    "/projection": projection_endpoint,
+    "/projection/batch": projection_batch_endpoint,
+    "/rollups": rollups_endpoint,
+}
+
+
+# =========================================================
+# SERVER (FIXED WORKER POOL, KEEP-ALIVE)
+# =========================================================
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 15    # idle keep-alive connections give their worker back
+
+    def _send(self, status, payload):
+        data = json.dumps(_jsonable(payload), allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "endpoints": sorted(ROUTES)})
+        else:
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        route = ROUTES.get(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(413, {"error": "Request body too large"})
+            return
+        raw = self.rfile.read(length)
+        if route is None:
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        try:
+            body = json.loads(raw or b"{}")
+            if not isinstance(body, dict):
+                raise ApiError("Request body must be a JSON object")
+            self._send(200, route(body))
+        except json.JSONDecodeError as e:
+            self._send(400, {"error": f"Invalid JSON: {e}"})
+        except ApiError as e:
+            self._send(e.status, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledHTTPServer(HTTPServer):
+    # Connections are handed to a fixed thread pool instead of one new thread each
+    daemon_threads = True
+
+    def __init__(self, address, handler, workers=API_WORKERS):
+        super().__init__(address, handler)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+def serve(host=API_HOST, port=API_PORT, workers=API_WORKERS):
+    server = PooledHTTPServer((host, port), ApiHandler, workers)
+    thread = threading.Thread(target=server.serve_forever, name="api-server", daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON API for the EdTech finance engines")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    args = parser.parse_args()
+
+    server = PooledHTTPServer((args.host, args.port), ApiHandler, args.workers)
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
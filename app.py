@@ -1,9 +1,35 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import numpy_financial as nf
 import plotly.graph_objects as go
 
+from analytics import (
+    day_numbers, lead_to_payment_lag, collection_curves, receivables_aging,
+    LEADERBOARD_METRICS, assignee_month_cube, leaderboard,
+    dense_revenue, rolling_metrics,
+    MONTH_NAMES, DEFAULT_FY_START, fiscal_keys, fiscal_rollups,
+    emi_schedule
+)
+from finance import MODE_A, metric_block, runway, pnl_series, MAX_SIM_MONTHS, simulate_cash, runway_summary
+from forecast import calibrate
+from scenarios import ScenarioStore
+from shared_cache import get_dataset_cache, content_key
+from export import EXPORT_FORMATS, export_to_tempfile
+from sheets import get_sheet_fetcher, sheet_csv_url
+from validation import AMOUNT_COLS, read_ledger_csv, validate_ledger, default_dedup_keys, dedupe_rows
+from progressive import needs_preview, sample_csv_bytes, head_csv_bytes
+from jobs import JobSession, get_job_manager
+from sketches import SKETCH_VALUE_COLS, SKETCH_GROUP_COLS, build_sketches
+from figures import get_plot_template, cached_figure
+from query import QUERY_BACKEND, get_query_backend, fiscal_period_mask
+
+# Copy-on-Write: frames derived from shared cache entries never write into them
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Shared Plotly layout template, registered once per process
+PLOT_TEMPLATE = get_plot_template()
+
 # Header & Logo
 # -------------------------
 logo_url = "https://raw.githubusercontent.com/Analytics-Avenue/streamlit-dataapp/main/logo.png"
@@ -133,7 +159,7 @@ def combo_chart_plotly(df, x_col, bar_col, line_col, title, line_suffix="%"):
     if df.empty:
         fig = go.Figure()
         fig.add_annotation(text="No data", x=0.5, y=0.5, showarrow=False)
-        fig.update_layout(title=title, template="plotly_white")
+        fig.update_layout(title=title, template=PLOT_TEMPLATE)
         return fig
 
     # Color bars: green if line >=0, red if <0
@@ -174,7 +200,7 @@ def combo_chart_plotly(df, x_col, bar_col, line_col, title, line_suffix="%"):
 
     fig.update_layout(
         title=title,
-        template="plotly_white",
+        template=PLOT_TEMPLATE,
         xaxis=dict(
             title=x_col,
             tickangle=-45
@@ -197,6 +223,217 @@ def combo_chart_plotly(df, x_col, bar_col, line_col, title, line_suffix="%"):
 
     return fig
 
+# =========================================================
+# PLOTLY P&L HELPER (GROUPED BARS + EBITDA MARGIN LINE)
+# =========================================================
+def pnl_chart_plotly(pnl, x_col, title):
+    fig = go.Figure()
+    if pnl.empty:
+        fig.add_annotation(text="No data", x=0.5, y=0.5, showarrow=False)
+        fig.update_layout(title=title, template=PLOT_TEMPLATE)
+        return fig
+
+    for col, color in [
+        ("Revenue (₹)", "#3498db"),
+        ("EBITDA (₹)", "#2ecc71"),
+        ("Net Profit (₹)", "#16a085"),
+        ("FCF (₹)", "#9b59b6"),
+    ]:
+        fig.add_trace(go.Bar(
+            x=pnl[x_col], y=pnl[col], name=col, marker_color=color,
+            hovertemplate=f"{col}: %{{y:,.0f}}<extra></extra>"
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=pnl[x_col], y=pnl["EBITDA Margin %"], name="EBITDA Margin %",
+        mode="lines+markers", line=dict(color="#e67e22", width=2), yaxis="y2",
+        hovertemplate="EBITDA Margin: %{y:.2f}%<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=title,
+        template=PLOT_TEMPLATE,
+        barmode="group",
+        xaxis=dict(title=x_col, tickangle=-45),
+        yaxis=dict(title="₹", showgrid=True, gridcolor="rgba(0,0,0,0.1)"),
+        yaxis2=dict(title="EBITDA Margin %", overlaying="y", side="right", showgrid=False),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
+        margin=dict(l=40, r=40, t=60, b=90)
+    )
+    return fig
+
+# =========================================================
+# PLOTLY FORECAST HELPER (HISTORY + FORECAST BAND)
+# =========================================================
+def forecast_chart_plotly(history, forecast, title):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=history["period"], y=history["Revenue (₹)"], name="Actual Revenue",
+        marker_color="#3498db", hovertemplate="Actual: %{y:,.0f}<extra></extra>"
+    ))
+    if forecast is not None and len(forecast):
+        fig.add_trace(go.Scatter(
+            x=forecast["period"], y=forecast["Upper (₹)"], mode="lines",
+            line=dict(width=0), showlegend=False, hoverinfo="skip"
+        ))
+        fig.add_trace(go.Scatter(
+            x=forecast["period"], y=forecast["Lower (₹)"], mode="lines",
+            line=dict(width=0), fill="tonexty", fillcolor="rgba(41,128,185,0.15)",
+            name="95% band", hoverinfo="skip"
+        ))
+        fig.add_trace(go.Scatter(
+            x=forecast["period"], y=forecast["Forecast (₹)"], name="Forecast",
+            mode="lines+markers", line=dict(color="#2980b9", width=2, dash="dash"),
+            hovertemplate="Forecast: %{y:,.0f}<extra></extra>"
+        ))
+    fig.update_layout(
+        title=title,
+        template=PLOT_TEMPLATE,
+        xaxis=dict(tickangle=-45),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
+        margin=dict(l=40, r=40, t=60, b=90)
+    )
+    return fig
+
+# =========================================================
+# PLOTLY HEATMAP HELPER (COHORT MATRICES)
+# =========================================================
+def heatmap_plotly(matrix, title, value_suffix="", colorscale="Blues"):
+    if matrix.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No data", x=0.5, y=0.5, showarrow=False)
+        fig.update_layout(title=title, template=PLOT_TEMPLATE)
+        return fig
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=matrix.values,
+            x=[str(c) for c in matrix.columns],
+            y=[str(i) for i in matrix.index],
+            colorscale=colorscale,
+            hovertemplate=f"%{{y}} · %{{x}}: %{{z:,.1f}}{value_suffix}<extra></extra>"
+        )
+    )
+    fig.update_layout(
+        title=title,
+        template=PLOT_TEMPLATE,
+        yaxis=dict(autorange="reversed"),
+        margin=dict(l=40, r=40, t=60, b=60)
+    )
+    return fig
+
+# =========================================================
+# LEDGER LOADING & PREPROCESSING (BUILDERS FOR THE SHARED CACHE)
+# =========================================================
+def preprocess_ledger(df_rev, dedup_keys=()):
+    # Validation coerces each documented column once; preprocessing reuses the result
+    parsed, validation_report = validate_ledger(df_rev)
+
+    df = df_rev.copy()
+    for col, values in parsed.items():
+        df[col] = values
+
+    # Duplicate payments (re-exports, overlapping sheets) are dropped on the coerced keys
+    validation_report["dedup"] = None
+    if dedup_keys:
+        keep, validation_report["dedup"] = dedupe_rows(df, list(dedup_keys))
+        df = df[keep]
+
+    df = df.dropna(subset=["first_payment_date"])
+    df["collected_amount"] = df["collected_amount"].fillna(0)
+
+    # Optional columns
+    if "total_fee" in df.columns:
+        df["total_fee"] = df["total_fee"].fillna(0)
+    if "pending_amount" in df.columns:
+        df["pending_amount"] = df["pending_amount"].fillna(0)
+
+    # Integer day offsets (reused by aging, cohorts, rolling windows)
+    df["payment_day"] = day_numbers(df["first_payment_date"])[0]
+
+    df["year"] = df["first_payment_date"].dt.year
+    df["month"] = df["first_payment_date"].dt.month
+    df["month_period"] = df["first_payment_date"].dt.to_period("M").astype(str)
+    df["quarter_period"] = df["first_payment_date"].dt.to_period("Q").astype(str)
+    return df, validation_report
+
+
+def preview_ledger(data):
+    # Sampled preview of a large CSV → (raw sample, estimated data rows in the file)
+    sample, est_rows = sample_csv_bytes(data)
+    try:
+        return read_ledger_csv(sample), est_rows
+    except pd.errors.ParserError:
+        head = head_csv_bytes(data)
+        raw = read_ledger_csv(head)
+        return raw, int(len(raw) * len(data) / max(len(head), 1))
+
+
+def preprocess_preview(df_sample, dedup_keys, scale):
+    # Amounts are scaled by rows-in-file / rows-in-sample, so sums estimate the full totals
+    df, validation_report = preprocess_ledger(df_sample, dedup_keys)
+    for col in AMOUNT_COLS:
+        if col in df.columns:
+            df[col] = df[col] * scale
+    return df, validation_report
+
+
+def build_exact_ledger(job, dataset_cache, data, rename, prep_key, dedup_keys):
+    # Background job: full parse, preprocessing and sketches into the shared cache → cache keys.
+    # The job's own leases are released on return; each session acquires its own from the keys.
+    raw_key, sketch_key = content_key(data, "raw"), f"{prep_key}:sketches"
+    job.report(0.05, "Parsing full file")
+    raw_lease = dataset_cache.acquire(raw_key, lambda: read_ledger_csv(data))
+    try:
+        df_rev = raw_lease.frame.rename(columns=rename) if rename else raw_lease.frame
+        job.report(0.5, "Validating and preprocessing")
+        prep_lease = dataset_cache.acquire(prep_key, lambda: preprocess_ledger(df_rev, dedup_keys))
+        try:
+            job.report(0.85, "Building distribution sketches")
+            dataset_cache.acquire(sketch_key, lambda: build_sketches(prep_lease.frame[0])).release()
+        finally:
+            prep_lease.release()
+    finally:
+        raw_lease.release()
+    return raw_key, prep_key, sketch_key
+
+# =========================================================
+# SCENARIO STORE (ONE PER SERVER PROCESS)
+# =========================================================
+@st.cache_resource
+def get_scenario_store():
+    return ScenarioStore()
+
+# =========================================================
+# CACHED ANALYTICS (recomputed only when filtered data changes)
+# =========================================================
+# Ledger-sized inputs are passed as _df (not hashed); filter_key (dataset key + filter
+# ranges) identifies them, so a cache lookup never rescans the filtered ledger
+@st.cache_data(show_spinner=False)
+def cached_lag_distribution(_df, filter_key, cohort_by, bucket_days):
+    return lead_to_payment_lag(_df, cohort_by=cohort_by, bucket_days=bucket_days)
+
+
+@st.cache_data(show_spinner=False)
+def cached_collection_curves(_df, filter_key, cohort_by, max_months):
+    return collection_curves(_df, cohort_by=cohort_by, max_months=max_months)
+
+
+@st.cache_data(show_spinner=False)
+def cached_calibration(revenue, horizon):
+    # Keyed on the small monthly series, so refits are cheap on every filter change
+    return calibrate(np.asarray(revenue, dtype=float), horizon=horizon)
+
+
+@st.cache_data(show_spinner=False)
+def cached_assignee_cube(_df, filter_key):
+    return assignee_month_cube(_df)
+
+
+@st.cache_data(show_spinner=False)
+def cached_emi_schedule(_df, filter_key, n_emis, frequency_months):
+    return emi_schedule(_df, n_emis, frequency_months)
+
 # =========================================================
 # MAIN HEADER
 # =========================================================
@@ -226,11 +463,14 @@ with tab1:
         st.markdown("<div class='section-title'>Capabilities</div>", unsafe_allow_html=True)
         st.markdown("""
         <div class="card">
-        • Monthly / Quarterly / Annual Revenue<br>
+        • Monthly / Quarterly / Annual Revenue (calendar or fiscal year)<br>
         • MoM / QoQ / YoY Growth & CAGR<br>
         • Operational Cost vs OPEX<br>
         • EBITDA, Net Profit, FCF, Burn, Runway<br>
+        • Monthly / Quarterly P&L time series<br>
         • CAC, MRR, ARR, conversion metrics<br>
+        • Batch / lead-month cohort lag & collection curves<br>
+        • History-calibrated growth & Holt-Winters forecast<br>
         • 5–20 Year Projection with rising EBITDA%<br>
         • ROI / IRR / DCF Valuation / Exit Value<br>
         </div>
@@ -263,14 +503,14 @@ with tab2:
     desc_map = {
         "first_payment_date": "Date of first payment (used for monthly/quarterly/yearly slicing).",
         "collected_amount": "Fee actually collected (₹).",
-        "total_fee": "Total agreed fee per student (used for MRR proxy).",
+        "total_fee": "Total agreed fee per student (expanded into its EMI schedule for MRR / deferred revenue).",
         "joined_or_not": "Whether student joined (for completion / enrollment stats).",
         "pay_status": "Payment status.",
         "campaign_name": "Campaign / source (used for CAC drilling later if extended).",
-        "lead_created_date": "Lead creation date (for funnel analysis).",
-        "batch": "Batch or cohort identifier.",
-        "pending_amount": "Pending fee per student.",
-        "co_assignee": "Sales / coordinator owner."
+        "lead_created_date": "Lead creation date (for funnel and lead-to-payment lag analysis).",
+        "batch": "Batch or cohort identifier (used for cohort lag and collection curves).",
+        "pending_amount": "Pending fee per student (receivables aging, optional runway cash).",
+        "co_assignee": "Sales / coordinator owner (leaderboard)."
     }
 
     df_gloss = pd.DataFrame(
@@ -301,10 +541,13 @@ with tab2:
             "Revenue Growth Rate % = (Curr − Prev)/Prev × 100",
             "CAGR = ((Ending/Beginning)^(1/years) − 1)",
             "CAC = (Ad + Sales + CRM tools)/New Customers",
-            "MRR ≈ Total Fee / 3 (for 3 EMIs)",
+            "MRR = EMIs billed in the month (each Total Fee split into N EMIs from the first payment)",
+            "Deferred Revenue = cumulative collected − cumulative billed (when positive)",
             "ARR = MRR × 12",
+            "TTM Revenue = Σ revenue over trailing 12 months",
+            "Rolling MRR = trailing 3-month revenue / 3",
             "Burn Rate = Monthly loss during scaling",
-            "Runway = Cash in Bank / Monthly Burn",
+            "Runway = (Cash in Bank + Collectible Receivables) / Monthly Burn",
             "Lead Conversion Rate = Converted / Total Leads × 100",
             "Course Completion Rate = Completed / Enrolled × 100",
             "Placement Rate = Placed / Eligible × 100",
@@ -320,8 +563,22 @@ with tab3:
     st.markdown("<div class='section-title'>Step 1: Load Dataset</div>", unsafe_allow_html=True)
 
     df_rev = None
+    data_key = None
+    data_bytes = None
+    rename = None
+    est_rows = None     # set when df_rev is only a sample of a large file
     REQUIRED_COLS = ["first_payment_date", "collected_amount"]
 
+    # One copy of each dataset per server process, shared by all sessions.
+    # Leases live in session_state; a session letting go of one releases its reference.
+    dataset_cache = get_dataset_cache()
+
+    # Heavy steps run as background jobs; this session's jobs live in its own slots
+    job_manager = get_job_manager()
+    if "job_session" not in st.session_state:
+        st.session_state["job_session"] = JobSession(job_manager)
+    job_session = st.session_state["job_session"]
+
     data_mode = st.radio(
         "Choose Data Source:",
         ["Google Sheet link", "Upload CSV + Mapping"],
@@ -336,18 +593,20 @@ with tab3:
 
         if link:
             try:
-                sheet_id = link.split("/d/")[1].split("/")[0]
-                csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
-                df_tmp = pd.read_csv(csv_url)
-                df_tmp.columns = (
-                    df_tmp.columns
-                    .str.strip()
-                    .str.lower()
-                    .str.replace(" ", "_")
-                )
-                st.success("Google Sheet loaded successfully.")
+                csv_url = sheet_csv_url(link)
+                # Pooled async client: timeouts, retries, ETag/Last-Modified revalidation, on-disk cache
+                sheet_bytes, sheet_source = get_sheet_fetcher().fetch_sync(csv_url)
+                data_bytes = sheet_bytes
+                if needs_preview(sheet_bytes):
+                    df_tmp, est_rows = preview_ledger(sheet_bytes)
+                else:
+                    lease = dataset_cache.acquire(content_key(sheet_bytes, "raw"), lambda: read_ledger_csv(sheet_bytes))
+                    st.session_state["raw_lease"] = lease
+                    df_tmp = lease.frame
+                st.success(f"Google Sheet loaded successfully ({sheet_source}).")
                 st.dataframe(df_tmp.head(), width="stretch")
-                df_rev = df_tmp.copy()
+                df_rev = df_tmp
+                data_key = content_key(sheet_bytes, "sheet")
             except Exception as e:
                 st.error(f"Failed to fetch Google Sheet: {e}")
 
@@ -357,13 +616,15 @@ with tab3:
     else:
         file = st.file_uploader("Upload CSV file", type=["csv"])
         if file:
-            raw = pd.read_csv(file)
-            raw.columns = (
-                raw.columns
-                .str.strip()
-                .str.lower()
-                .str.replace(" ", "_")
-            )
+            file_bytes = file.getvalue()
+            file_key = content_key(file_bytes)
+            data_bytes = file_bytes
+            if needs_preview(file_bytes):
+                raw, est_rows = preview_ledger(file_bytes)
+            else:
+                lease = dataset_cache.acquire(content_key(file_bytes, "raw"), lambda: read_ledger_csv(file_bytes))
+                st.session_state["raw_lease"] = lease
+                raw = lease.frame
             st.write("Preview of uploaded file:")
             st.dataframe(raw.head(), width="stretch")
 
@@ -381,10 +642,16 @@ with tab3:
                 if missing:
                     st.error("Please complete all mapping fields.")
                 else:
-                    inv = {v: k for k, v in mapping.items()}
-                    df_rev = raw.rename(columns=inv)
-                    st.success("Mapping Applied.")
-                    st.dataframe(df_rev.head(), width="stretch")
+                    # Kept per file, so later reruns (filters, background results) keep the mapping
+                    st.session_state["applied_mapping"] = (file_key, mapping)
+
+            applied = st.session_state.get("applied_mapping")
+            if applied and applied[0] == file_key:
+                rename = {v: k for k, v in applied[1].items()}
+                df_rev = raw.rename(columns=rename)
+                data_key = content_key(file_bytes, "csv", sorted(applied[1].items()))
+                st.success("Mapping Applied.")
+                st.dataframe(df_rev.head(), width="stretch")
 
     # If still no data, stop
     if df_rev is None:
@@ -394,141 +661,228 @@ with tab3:
     # =========================================================
     # PREPROCESSING
     # =========================================================
-    df = df_rev.copy()
-
-    if any(col not in df.columns for col in REQUIRED_COLS):
+    if any(col not in df_rev.columns for col in REQUIRED_COLS):
         st.error("Dataset must contain first_payment_date & collected_amount after mapping.")
         st.stop()
 
-    df["first_payment_date"] = pd.to_datetime(df["first_payment_date"], errors="coerce")
-    df = df.dropna(subset=["first_payment_date"])
-
-    df["collected_amount"] = pd.to_numeric(df["collected_amount"], errors="coerce").fillna(0)
-
-    # Optional columns
-    if "total_fee" in df.columns:
-        df["total_fee"] = pd.to_numeric(df["total_fee"], errors="coerce").fillna(0)
+    dedup_keys = st.multiselect(
+        "Duplicate payment key columns (rows repeating all of these are counted once)",
+        list(df_rev.columns),
+        default=default_dedup_keys(df_rev.columns),
+        help="E.g. student, payment date and amount. Leave empty to keep every row."
+    )
 
-    df["year"] = df["first_payment_date"].dt.year
-    df["month"] = df["first_payment_date"].dt.month
-    df["month_period"] = df["first_payment_date"].dt.to_period("M").astype(str)
-    df["quarter_period"] = df["first_payment_date"].dt.to_period("Q").astype(str)
+    prep_key = f"{data_key}:prep:{sorted(dedup_keys)}"
+    est_scale = None
+    if est_rows is None:
+        prep_lease = dataset_cache.acquire(prep_key, lambda: preprocess_ledger(df_rev, tuple(dedup_keys)))
+        st.session_state["prep_lease"] = prep_lease
+        df, validation_report = prep_lease.frame
+        dataset_key = prep_key
+        # Mergeable per-(month, group) quantile sketches, streamed over the ledger in chunks
+        st.session_state["sketch_lease"] = dataset_cache.acquire(
+            f"{prep_key}:sketches", lambda: build_sketches(df)
+        )
+    else:
+        # Large file: the exact build runs in the background; the sample stands in until it is done
+        # Same key → same job, so reruns while it runs never start a second build;
+        # changing the dedup keys supersedes (cancels) the previous build
+        ingest_job = job_manager.submit(
+            job_session.slot("ingest"), prep_key,
+            build_exact_ledger, dataset_cache, data_bytes, rename, prep_key, tuple(dedup_keys)
+        )
+        if ingest_job.done():
+            try:
+                raw_key, _, sketch_key = ingest_job.result()
+            except Exception as e:
+                st.error(f"Failed to process the full dataset: {e}")
+                st.stop()
+            # This session's own leases; the builders only run if the entries were evicted meanwhile
+            prep_lease = st.session_state.get("prep_lease")
+            if prep_lease is None or prep_lease.key != prep_key:
+                raw_lease = dataset_cache.acquire(raw_key, lambda: read_ledger_csv(data_bytes))
+                df_full = raw_lease.frame.rename(columns=rename) if rename else raw_lease.frame
+                prep_lease = dataset_cache.acquire(prep_key, lambda: preprocess_ledger(df_full, tuple(dedup_keys)))
+                st.session_state["sketch_lease"] = dataset_cache.acquire(
+                    sketch_key, lambda: build_sketches(prep_lease.frame[0])
+                )
+                st.session_state["raw_lease"], st.session_state["prep_lease"] = raw_lease, prep_lease
+            st.session_state.pop("preview_lease", None)
+            df, validation_report = st.session_state["prep_lease"].frame
+            dataset_key = prep_key
+        else:
+            est_scale = est_rows / max(len(df_rev), 1)
+            preview_lease = dataset_cache.acquire(
+                f"{prep_key}:preview",
+                lambda: preprocess_preview(df_rev, tuple(dedup_keys), est_scale)
+            )
+            st.session_state["preview_lease"] = preview_lease
+            df, validation_report = preview_lease.frame
+            dataset_key = preview_lease.key
+            st.warning(
+                f"Preview mode: figures below are ESTIMATED from {len(df_rev):,} sampled rows "
+                f"of ~{est_rows:,}. Exact results are being computed in the background."
+            )
+    est_tag = " (estimated)" if est_scale is not None else ""
+
+    # Data quality (rows dropped / zero-filled during coercion are reported, not silent)
+    if validation_report["rows_dropped"] > 0:
+        st.warning(
+            f"{validation_report['rows_dropped']:,} of {validation_report['rows_in']:,} rows "
+            f"({validation_report['rows_dropped'] / validation_report['rows_in'] * 100:.1f}%) have a missing or "
+            f"unparseable first_payment_date and were excluded."
+        )
+    dedup_report = validation_report["dedup"]
+    if dedup_report is not None:
+        if dedup_report["rows_dropped"] > 0:
+            st.warning(
+                f"Dropped {dedup_report['rows_dropped']:,} duplicate payment rows "
+                f"(key: {', '.join(dedup_report['key_columns'])}), removing "
+                f"₹{dedup_report['revenue_dropped']:,.0f} of double-counted revenue."
+            )
+        else:
+            st.caption(f"No duplicate payments on key: {', '.join(dedup_report['key_columns'])}.")
+    with st.expander(
+        f"Data Quality: {validation_report['rows_with_issues']:,} of {validation_report['rows_in']:,} rows flagged"
+    ):
+        issues = validation_report["summary"]
+        st.dataframe(
+            issues[issues["Rows"] > 0].style.format({"Rows": "{:,.0f}", "% of Rows": "{:.2f}"}),
+            width="stretch"
+        )
+        if len(validation_report["sample"]):
+            st.write("Sample of flagged rows:")
+            st.dataframe(validation_report["sample"], width="stretch")
+
+    cache_stats = dataset_cache.stats()
+    st.caption(
+        f"Shared dataset cache: {cache_stats['entries']} dataset(s), "
+        f"{cache_stats['bytes'] / 1024**2:,.1f} MB of {cache_stats['budget_bytes'] / 1024**2:,.0f} MB budget"
+    )
 
     # =========================================================
     # STEP 2 — FILTERS
     # =========================================================
     st.markdown("<div class='section-title'>Step 2: Filters</div>", unsafe_allow_html=True)
     
+    # Fiscal calendar: keys come from the cached integer year/month columns (no date parsing)
+    fy_start = st.selectbox(
+        "Fiscal Year Starts In",
+        list(range(1, 13)),
+        index=DEFAULT_FY_START - 1,
+        format_func=lambda m: MONTH_NAMES[m - 1] + (" (calendar year)" if m == 1 else ""),
+        help="Choose Apr for the Indian April–March fiscal year. Fiscal years are named by the year they end in."
+    )
+
+    # Filters and rollups run on the configured query backend (QUERY_BACKEND: pandas / duckdb / polars)
+    try:
+        query_backend = get_query_backend()
+    except (ValueError, ImportError) as e:
+        st.warning(f"Query backend '{QUERY_BACKEND}' is unavailable ({e}). Using pandas.")
+        query_backend = get_query_backend("pandas")
+
+    # Slider bounds come from the distinct (year, month) rollup, not from every row;
+    # the filters select whole months, so Step 3 re-aggregates from this rollup too.
+    # DuckDB / Polars scan a Parquet copy written once per dataset key.
+    query_source = query_backend.prepare(df, dataset_key)
+    base_all = query_backend.month_rollup(query_source)
+    fiscal_year, fiscal_quarter, fiscal_month = fiscal_keys(base_all["year"], base_all["month"], fy_start)
+
     # Create 3 columns in one row
     colM, colQ, colY = st.columns(3)
     
     # -------------------- YEAR RANGE FILTER --------------------
     with colY:
-        all_years = sorted(df["year"].unique())
-        year_min = int(min(all_years))
-        year_max = int(max(all_years))
+        year_min = int(fiscal_year.min())
+        year_max = int(fiscal_year.max())
         year_range = st.slider(
-            "Year Range",
+            "Year Range" if fy_start == 1 else "Fiscal Year Range",
             min_value=year_min,
             max_value=year_max,
             value=(year_min, year_max)
         )
-        df = df[(df["year"] >= year_range[0]) & (df["year"] <= year_range[1])]
+        keep = (fiscal_year >= year_range[0]) & (fiscal_year <= year_range[1])
     
     # -------------------- MONTH RANGE FILTER --------------------
     with colM:
-        month_min = int(df["month"].min())
-        month_max = int(df["month"].max())
+        month_min = int(fiscal_month[keep].min())
+        month_max = int(fiscal_month[keep].max())
     
         month_range = st.slider(
-            "Month Range",
+            "Month Range" if fy_start == 1 else f"Fiscal Month Range (1 = {MONTH_NAMES[fy_start - 1]})",
             min_value=1,
             max_value=12,
             value=(month_min, month_max)
         )
-        df = df[(df["month"] >= month_range[0]) & (df["month"] <= month_range[1])]
+        keep &= (fiscal_month >= month_range[0]) & (fiscal_month <= month_range[1])
     
     # -------------------- QUARTER RANGE FILTER --------------------
     with colQ:
-        # Extract quarter number from your "2025Q1" format
-        df["quarter_num"] = df["quarter_period"].str[-1].astype(int)
-    
-        q_min = int(df["quarter_num"].min())
-        q_max = int(df["quarter_num"].max())
+        q_min = int(fiscal_quarter[keep].min())
+        q_max = int(fiscal_quarter[keep].max())
     
         quarter_range = st.slider(
-            "Quarter Range",
+            "Quarter Range" if fy_start == 1 else "Fiscal Quarter Range",
             min_value=1,
             max_value=4,
             value=(q_min, q_max)
         )
-        df = df[(df["quarter_num"] >= quarter_range[0]) & (df["quarter_num"] <= quarter_range[1])]
-    
-    # Cleanup
-    df.drop(columns=["quarter_num"], inplace=True, errors="ignore")
+
+    df = df[query_backend.period_mask(query_source, fy_start, year_range, month_range, quarter_range)]
+    # Identifies the filtered ledger for the cached analytics below
+    filter_key = (dataset_key, fy_start, tuple(year_range), tuple(month_range), tuple(quarter_range))
+    base = base_all[fiscal_period_mask(base_all, fy_start, year_range, month_range, quarter_range)]
     
-    st.success(f"Filtered rows: {len(df)}")
+    if est_scale is None:
+        st.success(f"Filtered rows: {len(df)}")
+    else:
+        st.success(f"Filtered rows: ~{len(df) * est_scale:,.0f} (estimated from {len(df):,} sampled rows)")
+    st.caption(f"Query backend: {query_backend.name}")
     st.dataframe(df.head(), width="stretch")
 
     # =========================================================
     # STEP 3 — MONTHLY / QUARTERLY / YEARLY + GROWTH
     # =========================================================
     # Monthly
-    st.markdown("<div class='section-title'>Monthly Revenue</div>", unsafe_allow_html=True)
+    st.markdown(f"<div class='section-title'>Monthly Revenue{est_tag}</div>", unsafe_allow_html=True)
 
-    monthly = (
-        df.groupby("month_period")["collected_amount"]
-        .sum()
-        .reset_index()
-        .sort_values("month_period")
-    )
-    monthly.rename(columns={"collected_amount": "Revenue (₹)"}, inplace=True)
+    # One small (year, month) rollup; monthly / quarterly / yearly views (calendar or fiscal)
+    # are re-aggregated from it
+    monthly, quarterly, yearly = fiscal_rollups(base.reset_index(drop=True), fy_start)
     monthly["MoM %"] = monthly["Revenue (₹)"].pct_change() * 100
-    monthly["MoM %"].fillna(0, inplace=True)
+    monthly["MoM %"] = monthly["MoM %"].fillna(0)
 
     st.write("### Table: Monthly Revenue")
     st.dataframe(monthly.style.format({"Revenue (₹)": "{:,.2f}", "MoM %": "{:.2f}"}), width="stretch")
 
-    fig_m = combo_chart_plotly(
+    fig_m = cached_figure(
+        combo_chart_plotly,
         monthly, "month_period", "Revenue (₹)", "MoM %",
         "Monthly Revenue + MoM Growth", "%"
     )
     st.plotly_chart(fig_m, width="stretch")
 
     # Quarterly
-    st.markdown("<div class='section-title'>Quarterly Revenue</div>", unsafe_allow_html=True)
+    st.markdown(f"<div class='section-title'>Quarterly Revenue{est_tag}</div>", unsafe_allow_html=True)
 
-    quarterly = (
-        df.groupby("quarter_period")["collected_amount"]
-        .sum()
-        .reset_index()
-        .sort_values("quarter_period")
-    )
-    quarterly.rename(columns={"collected_amount": "Revenue (₹)"}, inplace=True)
     quarterly["QoQ %"] = quarterly["Revenue (₹)"].pct_change() * 100
-    quarterly["QoQ %"].fillna(0, inplace=True)
+    quarterly["QoQ %"] = quarterly["QoQ %"].fillna(0)
 
     st.write("### Table: Quarterly Revenue")
     st.dataframe(quarterly.style.format({"Revenue (₹)": "{:,.2f}", "QoQ %": "{:.2f}"}), width="stretch")
 
-    fig_q = combo_chart_plotly(
+    fig_q = cached_figure(
+        combo_chart_plotly,
         quarterly, "quarter_period", "Revenue (₹)", "QoQ %",
         "Quarterly Revenue + QoQ Growth", "%"
     )
     st.plotly_chart(fig_q, width="stretch")
 
     # Yearly
-    st.markdown("<div class='section-title'>Annual Revenue</div>", unsafe_allow_html=True)
+    st.markdown(f"<div class='section-title'>Annual Revenue{est_tag}</div>", unsafe_allow_html=True)
 
-    yearly = (
-        df.groupby("year")["collected_amount"]
-        .sum()
-        .reset_index()
-        .sort_values("year")
-    )
-    yearly.rename(columns={"collected_amount": "Revenue (₹)"}, inplace=True)
     yearly["YoY %"] = yearly["Revenue (₹)"].pct_change() * 100
-    yearly["YoY %"].fillna(0, inplace=True)
+    yearly["YoY %"] = yearly["YoY %"].fillna(0)
 
     # CAGR
     if len(yearly) > 1:
@@ -545,12 +899,29 @@ with tab3:
     st.write("### Table: Annual Revenue")
     st.dataframe(yearly.style.format({"Revenue (₹)": "{:,.2f}", "YoY %": "{:.2f}"}), width="stretch")
 
-    fig_y = combo_chart_plotly(
+    fig_y = cached_figure(
+        combo_chart_plotly,
         yearly, "year", "Revenue (₹)", "YoY %",
         "Yearly Revenue + YoY Growth", "%"
     )
     st.plotly_chart(fig_y, width="stretch")
 
+    # Preview mode stops here; polling reruns the page once the exact build is ready
+    if est_scale is not None:
+        st.info(
+            "Revenue above is estimated from a sample. Exact figures and the remaining sections "
+            "(KPIs, cohorts, projections) appear automatically when background processing finishes."
+        )
+
+        @st.fragment(run_every=2)
+        def wait_for_exact():
+            st.progress(ingest_job.progress, text=ingest_job.message)
+            if ingest_job.done():
+                st.rerun()
+
+        wait_for_exact()
+        st.stop()
+
     # =========================================================
     # STEP 4 — KPI SUMMARY
     # =========================================================
@@ -566,6 +937,143 @@ with tab3:
     k3.markdown(f"<div class='kpi'>Average YoY Growth<br/>{avg_yoy:.2f}%</div>", unsafe_allow_html=True)
     k4.markdown(f"<div class='kpi'>CAGR<br/>{cagr*100:.2f}%</div>", unsafe_allow_html=True)
 
+    # =========================================================
+    # ROLLING METRICS (TTM, ROLLING MRR / ARR, ROLLING YoY)
+    # =========================================================
+    st.markdown("<div class='section-title'>Rolling Metrics</div>", unsafe_allow_html=True)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        rolling_grain = st.radio("Rolling Granularity", ["Monthly", "Daily"], horizontal=True)
+    with c2:
+        rolling_window = st.number_input(
+            "Custom Rolling Window (periods)",
+            min_value=1, max_value=3650, value=6, step=1,
+            help="Any window length is O(n): computed as a difference of one cumulative sum."
+        )
+
+    rolling = rolling_metrics(dense_revenue(df, rolling_grain), rolling_grain, rolling_window)
+    st.dataframe(
+        rolling.style.format({c: ("{:.2f}" if c.endswith("%") else "{:,.2f}") for c in rolling.columns if c != "period"}),
+        width="stretch"
+    )
+    fig_roll = cached_figure(
+        combo_chart_plotly,
+        rolling, "period", "TTM Revenue (₹)", "Rolling YoY %",
+        f"TTM Revenue + Rolling YoY ({rolling_grain})", "%"
+    )
+    st.plotly_chart(fig_roll, width="stretch")
+
+    # =========================================================
+    # COHORT ANALYSIS (BATCH / LEAD MONTH)
+    # =========================================================
+    cohort_options = []
+    if "batch" in df.columns:
+        cohort_options.append("Batch")
+    if "lead_created_date" in df.columns:
+        cohort_options.append("Lead Created Month")
+
+    if cohort_options:
+        st.markdown("<div class='section-title'>Cohort Analysis</div>", unsafe_allow_html=True)
+
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            cohort_choice = st.selectbox("Cohort By", cohort_options)
+        with c2:
+            lag_bucket_days = st.number_input("Lag Bucket Size (days)", min_value=1, max_value=60, value=7, step=1)
+        with c3:
+            curve_months = st.number_input("Collection Curve Horizon (months)", min_value=1, max_value=60, value=12, step=1)
+        cohort_by = "batch" if cohort_choice == "Batch" else "lead_created_date"
+
+        if "lead_created_date" in df.columns:
+            lag_dist, lag_summary = cached_lag_distribution(df, filter_key, cohort_by, int(lag_bucket_days))
+            st.write("### Lead → First Payment Lag by Cohort")
+            st.dataframe(
+                lag_summary.style.format({"Avg Lag (days)": "{:.1f}", "Paid ≤30d %": "{:.1f}"}),
+                width="stretch"
+            )
+            st.plotly_chart(
+                cached_figure(heatmap_plotly, lag_dist, "Students by Days from Lead to First Payment"),
+                width="stretch"
+            )
+        else:
+            st.info("Add a lead_created_date column to see lead-to-payment lag per cohort.")
+
+        curves = cached_collection_curves(df, filter_key, cohort_by, int(curve_months))
+        st.write("### Cumulative Collection Curves (% of cohort fee)")
+        st.plotly_chart(
+            cached_figure(heatmap_plotly, curves, "Cumulative Collections by Months Since Enrollment", "%", "Greens"),
+            width="stretch"
+        )
+
+    # =========================================================
+    # RECEIVABLES AGING (PENDING AMOUNT)
+    # =========================================================
+    total_pending = 0.0
+    if "pending_amount" in df.columns:
+        st.markdown("<div class='section-title'>Receivables Aging</div>", unsafe_allow_html=True)
+
+        total_pending = float(df["pending_amount"].sum())
+        aging_dims = [c for c in ["batch", "co_assignee", "pay_status"] if c in df.columns]
+
+        c1, c2 = st.columns(2)
+        with c1:
+            aging_as_of = st.date_input("Aging As-Of Date", value=pd.Timestamp.today().date())
+        with c2:
+            aging_by = st.selectbox("Break Out By", ["Overall"] + aging_dims)
+
+        aging = receivables_aging(df, aging_as_of, by=None if aging_by == "Overall" else aging_by)
+        money_cols = [c for c in aging.columns if c != aging.columns[0]]
+
+        k1, k2 = st.columns(2)
+        k1.markdown(f"<div class='kpi'>Total Pending Receivables<br/>₹{total_pending:,.0f}</div>", unsafe_allow_html=True)
+        overdue_90 = aging["90+ days"].sum() if len(aging) else 0.0
+        k2.markdown(f"<div class='kpi'>Pending 90+ Days<br/>₹{overdue_90:,.0f}</div>", unsafe_allow_html=True)
+
+        st.dataframe(aging.style.format({c: "{:,.2f}" for c in money_cols}), width="stretch")
+
+    # =========================================================
+    # SALES-OWNER LEADERBOARD (CO_ASSIGNEE)
+    # =========================================================
+    if "co_assignee" in df.columns:
+        st.markdown("<div class='section-title'>Sales Owner Leaderboard</div>", unsafe_allow_html=True)
+
+        # Cube is built once per filtered dataset; metric / period / k only re-rank it
+        cube = cached_assignee_cube(df, filter_key)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            lb_metric = st.selectbox("Rank By", list(LEADERBOARD_METRICS))
+        with c2:
+            lb_k = st.number_input("Top K", min_value=1, max_value=500, value=20, step=5)
+
+        lb_months = cube["months"]
+        if len(lb_months) > 1:
+            lb_period = st.select_slider(
+                "Leaderboard Period",
+                options=lb_months,
+                value=(lb_months[0], lb_months[-1])
+            )
+        else:
+            lb_period = (lb_months[0], lb_months[-1]) if lb_months else (None, None)
+
+        if lb_months:
+            board = leaderboard(
+                cube, lb_metric, lb_k,
+                month_start=lb_months.index(lb_period[0]),
+                month_end=lb_months.index(lb_period[1])
+            )
+            st.dataframe(
+                board.style.format({
+                    "Collected Revenue (₹)": "{:,.2f}",
+                    "Pending Amount (₹)": "{:,.2f}",
+                    "Conversion %": "{:.2f}",
+                    "Average Deal Size (₹)": "{:,.2f}",
+                    "Leads": "{:,.0f}"
+                }),
+                width="stretch"
+            )
+
     # =========================================================
     # STEP 5 — MODE SELECTOR (A vs B)
     # =========================================================
@@ -588,15 +1096,30 @@ with tab3:
         step=50000.0
     )
 
+    # Optional: pending receivables as an additional cash source for runway
+    receivables_cash = 0.0
+    if total_pending > 0:
+        c1, c2 = st.columns(2)
+        with c1:
+            include_receivables = st.checkbox("Count pending receivables as a cash source for runway")
+        with c2:
+            receivables_collect_pct = st.number_input(
+                "Expected Collection of Receivables (%)",
+                min_value=0.0, max_value=100.0, value=80.0
+            )
+        if include_receivables:
+            receivables_cash = total_pending * (receivables_collect_pct / 100)
+    runway_cash = cash_in_bank + receivables_cash
+
     if mode_engine.startswith("Mode A"):
         # --------------------------
         # MODE A — INDUSTRY MODEL
         # --------------------------
         st.info("Mode A: Using fixed industry assumptions → Operational Cost = 22%, OPEX = 52%, Reinvestment = 8%.")
 
-        op_cost_pct = 22.0
-        opex_pct = 52.0
-        reinvest_pct = 8.0
+        op_cost_pct = MODE_A["op_cost_pct"]
+        opex_pct = MODE_A["opex_pct"]
+        reinvest_pct = MODE_A["reinvest_pct"]
 
     else:
         # --------------------------
@@ -621,32 +1144,24 @@ with tab3:
             )
 
     # Compute metric block
+    metrics_df = pd.DataFrame()
     if total_rev > 0:
-        operational_cost = total_rev * (op_cost_pct / 100)
-        opex = total_rev * (opex_pct / 100)
-
-        gross_profit = total_rev - operational_cost
-        gross_margin_pct = (gross_profit / total_rev) * 100 if total_rev > 0 else 0
-
-        ebitda = total_rev - operational_cost - opex
-        ebitda_margin_pct = (ebitda / total_rev) * 100 if total_rev > 0 else 0
-
-        # As per your table (approx): Net Profit = revenue * EBITDA Margin%
-        net_profit = total_rev * (ebitda_margin_pct / 100)
-        net_profit_margin_pct = (net_profit / total_rev) * 100 if total_rev > 0 else 0
-
-        # FCF approx = Net Profit − revenue × reinvestment%
-        fcf = net_profit - (total_rev * (reinvest_pct / 100))
-
-        # Burn: if EBITDA < 0 → company is burning
-        burn_rate = 0.0
-        if ebitda < 0:
-            burn_rate = abs(ebitda)
-        # If using your earlier (0.74−1) logic, we can also show that:
-        approx_burn = total_rev * ((op_cost_pct + opex_pct)/100 - 1)
+        block = {k: float(v) for k, v in metric_block(total_rev, op_cost_pct, opex_pct, reinvest_pct).items()}
+
+        operational_cost = block["operational_cost"]
+        opex = block["opex"]
+        gross_profit = block["gross_profit"]
+        gross_margin_pct = block["gross_margin_pct"]
+        ebitda = block["ebitda"]
+        ebitda_margin_pct = block["ebitda_margin_pct"]
+        net_profit = block["net_profit"]
+        net_profit_margin_pct = block["net_profit_margin_pct"]
+        fcf = block["fcf"]
+        burn_rate = block["burn_rate"]
+        approx_burn = block["approx_burn"]
 
         # Runway
-        runway_months = cash_in_bank / burn_rate if burn_rate > 0 else float('inf')
+        runway_months = float(runway(runway_cash, burn_rate))
 
         # CAC inputs
         st.markdown("<div class='section-title'>CAC & Subscription Metrics</div>", unsafe_allow_html=True)
@@ -662,15 +1177,18 @@ with tab3:
 
         cac = (ad_spend + sales_salaries + crm_tools_cost) / new_customers if new_customers > 0 else 0
 
-        # MRR / ARR
-        if "total_fee" in df.columns and df["total_fee"].sum() > 0:
-            total_program_fee = df["total_fee"].sum()
-        else:
-            # fallback: assume total_fee ≈ collected_amount for now
-            total_program_fee = total_rev
-
-        # Assuming 3 installments (your 30k → 3 × 10k logic) as proxy
-        mrr = total_program_fee / 3
+        # MRR / ARR from each student's installment schedule (total_fee split into EMIs)
+        e1, e2 = st.columns(2)
+        with e1:
+            n_emis = st.number_input("EMIs per Student", min_value=1, max_value=60, value=3, step=1)
+        with e2:
+            emi_frequency = st.number_input("Months Between EMIs", min_value=1, max_value=12, value=1, step=1)
+        schedule = cached_emi_schedule(df, filter_key, n_emis, emi_frequency)
+
+        # Current MRR = installments billed in the last month of the filtered data
+        last_month = monthly["month_period"].iloc[-1] if len(monthly) else None
+        current = schedule[schedule["month_period"] == last_month]
+        mrr = float(current["MRR (₹)"].iloc[0]) if len(current) else 0.0
         arr = mrr * 12
 
         metrics_data = {
@@ -687,9 +1205,10 @@ with tab3:
                 "Free Cash Flow (FCF, approx)",
                 "Burn Rate (if EBITDA < 0)",
                 "Approx Burn (using (op+opex-100%))",
+                "Receivables Counted as Cash",
                 "Runway (Months, if burning)",
                 "CAC (Cost per new customer)",
-                "MRR (3-EMI proxy)",
+                f"MRR (EMI schedule, {last_month})",
                 "ARR (12 × MRR)"
             ],
             "Value": [
@@ -705,6 +1224,7 @@ with tab3:
                 f"₹{fcf:,.2f}",
                 f"₹{burn_rate:,.2f}",
                 f"₹{approx_burn:,.2f}",
+                f"₹{receivables_cash:,.2f}",
                 "∞" if runway_months == float('inf') else f"{runway_months:.1f} months",
                 f"₹{cac:,.2f}",
                 f"₹{mrr:,.2f}",
@@ -713,9 +1233,153 @@ with tab3:
         }
         metrics_df = pd.DataFrame(metrics_data)
         st.dataframe(metrics_df, width="stretch")
+
+        # Billed vs collected per month, with the deferred revenue / receivables balance
+        st.markdown("<div class='section-title'>Installment Schedule: MRR & Deferred Revenue</div>", unsafe_allow_html=True)
+        st.caption(
+            f"Each student's total fee billed as {n_emis} EMI(s) every {emi_frequency} month(s) from the first "
+            "payment month. Deferred revenue = cash collected ahead of billing; receivables = billed but not yet collected."
+        )
+        fig_emi = go.Figure()
+        fig_emi.add_trace(go.Bar(x=schedule["month_period"], y=schedule["Billed (₹)"], name="Billed (MRR)",
+                                 marker_color="#064b86"))
+        fig_emi.add_trace(go.Bar(x=schedule["month_period"], y=schedule["Collected (₹)"], name="Collected",
+                                 marker_color="#2ecc71"))
+        fig_emi.add_trace(go.Scatter(x=schedule["month_period"], y=schedule["Deferred Revenue (₹)"],
+                                     name="Deferred Revenue", mode="lines", line=dict(color="#f39c12")))
+        fig_emi.add_trace(go.Scatter(x=schedule["month_period"], y=schedule["Receivables (₹)"],
+                                     name="Receivables", mode="lines", line=dict(color="#e74c3c", dash="dot")))
+        fig_emi.update_layout(title="Billed vs Collected Revenue", barmode="group", template=PLOT_TEMPLATE,
+                              xaxis_title="Month", yaxis_title="₹")
+        st.plotly_chart(fig_emi, width="stretch")
+        with st.expander("Installment schedule table"):
+            st.dataframe(
+                schedule.style.format({c: "{:,.2f}" for c in schedule.columns if c.endswith("(₹)")}),
+                width="stretch"
+            )
     else:
         st.warning("Total Revenue is zero after filters. Metrics cannot be computed.")
 
+    # =========================================================
+    # P&L TIME SERIES (SAME ENGINE, PER MONTH / QUARTER)
+    # =========================================================
+    st.markdown("<div class='section-title'>P&L Time Series</div>", unsafe_allow_html=True)
+
+    pnl_grain = st.radio("P&L Granularity", ["Monthly", "Quarterly"], horizontal=True)
+    if pnl_grain == "Monthly":
+        pnl = pnl_series(monthly, "month_period", op_cost_pct, opex_pct, reinvest_pct,
+                         cash=runway_cash, months_per_period=1)
+        pnl_x = "month_period"
+    else:
+        pnl = pnl_series(quarterly, "quarter_period", op_cost_pct, opex_pct, reinvest_pct,
+                         cash=runway_cash, months_per_period=3)
+        pnl_x = "quarter_period"
+
+    st.dataframe(
+        pnl.style.format({
+            c: ("{:.2f}" if c.endswith("%") else "{:.1f}" if c.startswith("Runway") else "{:,.2f}")
+            for c in pnl.columns if c != pnl_x
+        }),
+        width="stretch"
+    )
+    st.plotly_chart(cached_figure(pnl_chart_plotly, pnl, pnl_x, f"{pnl_grain} P&L: Revenue, EBITDA, Net Profit, FCF"), width="stretch")
+
+    # =========================================================
+    # MONTHLY CASH & RUNWAY SIMULATOR
+    # =========================================================
+    st.markdown("<div class='section-title'>Monthly Cash & Runway Simulator</div>", unsafe_allow_html=True)
+    st.caption(
+        "Month-by-month cash balance from the latest month's revenue, growth, margin, reinvestment "
+        "and an optional funding injection. Starts from the runway cash above."
+    )
+
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        sim_revenue = st.number_input(
+            "Starting Monthly Revenue (₹)", min_value=0.0,
+            value=float(monthly["Revenue (₹)"].iloc[-1]) if len(monthly) else 0.0, step=10000.0
+        )
+        sim_months = st.slider("Months to Simulate", min_value=12, max_value=MAX_SIM_MONTHS, value=60, step=12)
+    with c2:
+        sim_growth = st.number_input("Annual Revenue Growth (%)", value=round(float(cagr) * 100, 2))
+        sim_margin = st.number_input("Starting EBITDA Margin (%)", value=float(100 - op_cost_pct - opex_pct))
+    with c3:
+        sim_margin_growth = st.number_input("Annual EBITDA Margin Improvement (%)", value=0.0)
+        sim_funding = st.number_input("Funding Injection (₹)", min_value=0.0, value=0.0, step=100000.0)
+    with c4:
+        sim_funding_month = st.number_input(
+            "Funding Arrives in Month", min_value=1, max_value=MAX_SIM_MONTHS, value=12, step=1
+        )
+        sim_stochastic = st.checkbox("Stochastic Mode (Monte Carlo)")
+
+    sim_inputs = dict(
+        monthly_revenue=sim_revenue, growth_pct=sim_growth, ebitda_start_pct=sim_margin,
+        ebitda_growth_pct=sim_margin_growth, reinvest_pct=reinvest_pct, cash=runway_cash,
+        months=sim_months, funding=sim_funding, funding_month=sim_funding_month
+    )
+    sim_x = np.arange(1, sim_months + 1)
+
+    if sim_stochastic:
+        s1, s2, s3 = st.columns(3)
+        with s1:
+            sim_paths = st.number_input("Simulated Paths", min_value=100, max_value=50_000, value=5000, step=500)
+        with s2:
+            sim_growth_vol = st.number_input("Revenue Growth Volatility (% annualised)", min_value=0.0, value=25.0)
+        with s3:
+            sim_margin_vol = st.number_input("Monthly Margin Noise (% points)", min_value=0.0, value=2.0)
+
+        sim = simulate_cash(**sim_inputs, paths=sim_paths, growth_vol_pct=sim_growth_vol, margin_vol_pct=sim_margin_vol)
+        summary = runway_summary(sim["runway_months"])
+        fmt_runway = lambda v: "∞" if v == float("inf") else f"{v:.0f} months"
+
+        k1, k2, k3, k4 = st.columns(4)
+        k1.markdown(f"<div class='kpi'>Runway P10<br/>{fmt_runway(summary['p10'])}</div>", unsafe_allow_html=True)
+        k2.markdown(f"<div class='kpi'>Runway Median<br/>{fmt_runway(summary['p50'])}</div>", unsafe_allow_html=True)
+        k3.markdown(f"<div class='kpi'>Runway P90<br/>{fmt_runway(summary['p90'])}</div>", unsafe_allow_html=True)
+        k4.markdown(
+            f"<div class='kpi'>P(Out of Cash in {sim_months} mo)<br/>{summary['prob_out_of_cash'] * 100:.1f}%</div>",
+            unsafe_allow_html=True
+        )
+
+        # Fan chart of the cash balance across paths
+        bands = np.percentile(sim["cash"], [10, 50, 90], axis=0)
+        fig_sim = go.Figure()
+        fig_sim.add_trace(go.Scatter(x=sim_x, y=bands[2], mode="lines", line=dict(width=0), showlegend=False,
+                                     hoverinfo="skip"))
+        fig_sim.add_trace(go.Scatter(x=sim_x, y=bands[0], mode="lines", line=dict(width=0), fill="tonexty",
+                                     fillcolor="rgba(6,75,134,0.18)", name="P10–P90"))
+        fig_sim.add_trace(go.Scatter(x=sim_x, y=bands[1], mode="lines", line=dict(color="#064b86"), name="Median"))
+
+        finite_runway = sim["runway_months"][np.isfinite(sim["runway_months"])]
+        fig_hist = None
+        if len(finite_runway):
+            fig_hist = go.Figure(go.Histogram(x=finite_runway, marker_color="#e74c3c"))
+            fig_hist.update_layout(
+                title="Runway Distribution (paths that run out of cash)",
+                xaxis_title="Runway (months)", yaxis_title="Paths", template=PLOT_TEMPLATE
+            )
+    else:
+        sim = simulate_cash(**sim_inputs)
+        sim_runway = float(sim["runway_months"][0])
+        st.markdown(
+            f"<div class='kpi'>Simulated Runway<br/>"
+            f"{'∞ (cash never runs out)' if sim_runway == float('inf') else f'{sim_runway:.0f} months'}</div>",
+            unsafe_allow_html=True
+        )
+        fig_sim = go.Figure(go.Scatter(x=sim_x, y=sim["cash"][0], mode="lines", line=dict(color="#064b86"),
+                                       name="Cash Balance"))
+        fig_hist = None
+
+    fig_sim.add_hline(y=0, line_dash="dash", line_color="#e74c3c")
+    if sim_funding > 0:
+        fig_sim.add_vline(x=sim_funding_month, line_dash="dot", line_color="#2ecc71")
+    fig_sim.update_layout(
+        title="Projected Cash Balance", xaxis_title="Month", yaxis_title="Cash (₹)", template=PLOT_TEMPLATE
+    )
+    st.plotly_chart(fig_sim, width="stretch")
+    if fig_hist is not None:
+        st.plotly_chart(fig_hist, width="stretch")
+
     # =========================================================
     # STEP 7 — FUNNEL METRICS INPUTS (Completion, Placement, Leads, CSAT)
     # =========================================================
@@ -762,144 +1426,265 @@ with tab3:
     })
     st.dataframe(funnel_df, width="stretch")
 
+    # =========================================================
+    # DEAL SIZE & PAYMENT DISTRIBUTIONS (QUANTILE SKETCHES)
+    # =========================================================
+    st.markdown("<div class='section-title'>Deal Size & Payment Distributions</div>", unsafe_allow_html=True)
+
+    sketch = st.session_state["sketch_lease"].frame
+    d1, d2 = st.columns(2)
+    with d1:
+        dist_col = st.selectbox(
+            "Amount", [c for c in SKETCH_VALUE_COLS if c in df.columns],
+            format_func=lambda c: c.replace("_", " ").title()
+        )
+    with d2:
+        dist_by = st.selectbox(
+            "Break Down By", [None] + [c for c in SKETCH_GROUP_COLS if c in df.columns],
+            format_func=lambda c: "All Rows" if c is None else c.replace("_", " ").title()
+        )
+
+    # The filters select whole months, so the filtered distribution is a merge of those months' sketches
+    filtered_months = np.unique((df["year"].to_numpy() - 1970) * 12 + df["month"].to_numpy() - 1)
+    dist = sketch.quantiles(dist_col, dist_by, periods=filtered_months)
+    st.caption(f"Percentiles are approximate (within ±{sketch.alpha * 100:g}% of the true value); counts and means are exact.")
+    st.dataframe(
+        dist.style.format({c: "{:,.0f}" if c == "Count" else "{:,.2f}" for c in dist.columns if c != "Group"}),
+        width="stretch"
+    )
+    if dist_by is not None and len(dist):
+        top = dist.head(30)
+        fig_dist = go.Figure()
+        fig_dist.add_trace(go.Bar(x=top["Group"], y=top["P50"], name="Median", marker_color="#064b86"))
+        fig_dist.add_trace(go.Bar(x=top["Group"], y=top["P90"], name="P90", marker_color="#7fb3e0"))
+        fig_dist.update_layout(
+            title=f"Median & P90 {dist_col.replace('_', ' ').title()} by {dist_by.replace('_', ' ').title()}",
+            barmode="group", template=PLOT_TEMPLATE, yaxis_title="₹"
+        )
+        st.plotly_chart(fig_dist, width="stretch")
+
+    # =========================================================
+    # FORECAST & CALIBRATION (SEEDS THE PROJECTION INPUTS)
+    # =========================================================
+    st.markdown("<div class='section-title'>Forecast & Calibration</div>", unsafe_allow_html=True)
+
+    history = dense_revenue(df, "Monthly")
+    forecast_horizon = st.number_input(
+        "Forecast Horizon (months)", min_value=12, max_value=60, value=12, step=1
+    )
+    calib = cached_calibration(tuple(history["Revenue (₹)"]), int(forecast_horizon))
+    trend_fit = calib["trend"]
+    hw_forecast = calib["forecast"]
+
+    if trend_fit is None:
+        st.info("Need at least 3 months with revenue to calibrate growth from history.")
+    else:
+        k1, k2, k3 = st.columns(3)
+        k1.markdown(
+            f"<div class='kpi'>Trend YoY Growth<br/>{trend_fit['annual_growth_pct']:.1f}%</div>",
+            unsafe_allow_html=True
+        )
+        k2.markdown(
+            f"<div class='kpi'>95% Interval<br/>{trend_fit['annual_growth_low_pct']:.1f}% – "
+            f"{trend_fit['annual_growth_high_pct']:.1f}%</div>",
+            unsafe_allow_html=True
+        )
+        k3.markdown(
+            f"<div class='kpi'>Trend MoM Growth<br/>{trend_fit['period_growth_pct']:.2f}%</div>",
+            unsafe_allow_html=True
+        )
+
+    if hw_forecast is not None:
+        last_month = np.datetime64(history["period"].iloc[-1], "M")
+        hw_forecast = hw_forecast.assign(
+            period=(last_month + hw_forecast["step"].to_numpy()).astype(str)
+        )
+        hw_params = calib["holt_winters"]
+        st.caption(
+            f"Holt-Winters fit: α={hw_params['alpha']:.2f}, β={hw_params['beta']:.2f}, "
+            f"γ={hw_params['gamma']:.2f}, season={hw_params['season']} month(s)"
+        )
+        st.plotly_chart(
+            cached_figure(forecast_chart_plotly, history, hw_forecast, "Monthly Revenue: Actual + Forecast"),
+            width="stretch"
+        )
+
+    seed_from_history = st.checkbox(
+        "Seed projection inputs from history (next-12-month forecast as base revenue, trend growth as YoY growth)",
+        value=False,
+        disabled=trend_fit is None or hw_forecast is None
+    )
+
     # =========================================================
     # STEP 8 — INVESTOR PROJECTION (N-YEAR, RISING EBITDA%) + DCF
     # =========================================================
     st.markdown("<div class='section-title'>Investor Projection Model</div>", unsafe_allow_html=True)
 
+    store = get_scenario_store()
+
+    # Load a saved scenario into the projection inputs
+    saved_names = store.names()
+    if saved_names:
+        l1, l2 = st.columns([3, 1])
+        with l1:
+            load_name = st.selectbox("Saved Scenarios", saved_names)
+        with l2:
+            st.write("")
+            if st.button("Load Scenario"):
+                st.session_state["loaded_inputs"] = store.load(load_name)
+                # New widget keys → widgets pick up the loaded values as defaults
+                st.session_state["inputs_version"] = st.session_state.get("inputs_version", 0) + 1
+                st.rerun()
+
+    if seed_from_history:
+        base_rev_default = float(hw_forecast["Forecast (₹)"].iloc[:12].sum())
+        growth_default = float(np.clip(trend_fit["annual_growth_pct"], -50.0, 300.0))
+    else:
+        base_rev_default = float(total_rev) if total_rev > 0 else 600000.0
+        growth_default = 25.0
+
+    loaded = st.session_state.get("loaded_inputs") or dict(
+        base_rev=base_rev_default,
+        growth_pct=growth_default,
+        ebitda_start_pct=26.0,
+        ebitda_growth_pct=4.0,
+        reinvest_pct=8.0,
+        years=5,
+        invest=1000000.0,
+        equity_pct=20.0,
+        multiple=6.0,
+        discount_rate_pct=12.0
+    )
+    ver = st.session_state.get("inputs_version", 0)
+
     c1, c2 = st.columns(2)
     with c1:
+
         base_rev = st.number_input(
             "Base Revenue for Projection (₹)",
-            value=float(total_rev) if total_rev > 0 else 600000.0,
+            value=float(loaded["base_rev"]),
             min_value=0.0,
-            step=50000.0
+            step=50000.0,
+            key=f"base_rev_{ver}"
         )
 
         growth_pct = st.number_input(
             "Expected YoY Revenue Growth (%)",
             min_value=-50.0,
             max_value=300.0,
-            value=25.0,
-            help="Example: 25 means revenue grows 25% every year."
+            value=float(loaded["growth_pct"]),
+            help="Example: 25 means revenue grows 25% every year.",
+            key=f"growth_pct_{ver}"
         )
-        growth = growth_pct / 100.0
 
         ebitda_start_pct_proj = st.number_input(
             "Starting EBITDA Margin (% for Projection)",
             min_value=-50.0,
             max_value=100.0,
-            value=26.0,
-            help="EBITDA margin in Year 1. Example: 26 means 26%."
+            value=float(loaded["ebitda_start_pct"]),
+            help="EBITDA margin in Year 1. Example: 26 means 26%.",
+            key=f"ebitda_start_pct_{ver}"
         )
-        ebitda_start_proj = ebitda_start_pct_proj / 100.0
 
         ebitda_growth_pct_proj = st.number_input(
             "EBITDA Margin YoY Improvement (%)",
             min_value=-50.0,
             max_value=100.0,
-            value=4.0,
-            help="Example: 4 means EBITDA margin grows 4% per year (compounded)."
+            value=float(loaded["ebitda_growth_pct"]),
+            help="Example: 4 means EBITDA margin grows 4% per year (compounded).",
+            key=f"ebitda_growth_pct_{ver}"
         )
-        ebitda_growth_proj = ebitda_growth_pct_proj / 100.0
 
     with c2:
         projection_years = st.number_input(
             "Number of Projection Years (N)",
             min_value=1,
             max_value=20,
-            value=5,
-            step=1
+            value=int(loaded["years"]),
+            step=1,
+            key=f"years_{ver}"
         )
 
         invest = st.number_input(
             "Investor Capital (₹)",
-            value=1000000.0,
+            value=float(loaded["invest"]),
             min_value=0.0,
-            step=100000.0
+            step=100000.0,
+            key=f"invest_{ver}"
         )
 
         equity_pct = st.number_input(
             "Equity Stake (%)",
             min_value=0.0,
             max_value=100.0,
-            value=20.0,
-            help="Example: 20 means investor holds 20% equity."
+            value=float(loaded["equity_pct"]),
+            help="Example: 20 means investor holds 20% equity.",
+            key=f"equity_pct_{ver}"
         )
-        equity = equity_pct / 100.0
 
         multiple = st.number_input(
             "Exit EBITDA Multiple (×)",
-            value=6.0,
+            value=float(loaded["multiple"]),
             min_value=1.0,
             max_value=30.0,
             step=0.5,
-            help="Typical range 5–10× for high-growth EdTech/Analytics."
+            help="Typical range 5–10× for high-growth EdTech/Analytics.",
+            key=f"multiple_{ver}"
         )
 
         discount_rate_pct = st.number_input(
             "Discount Rate for DCF (%)",
             min_value=0.0,
             max_value=50.0,
-            value=12.0,
-            help="Common range 10–14% in India for this risk profile."
+            value=float(loaded["discount_rate_pct"]),
+            help="Common range 10–14% in India for this risk profile.",
+            key=f"discount_rate_pct_{ver}"
         )
-        discount_rate = discount_rate_pct / 100.0
 
         reinvest_proj_pct = st.number_input(
             "Reinvestment % in Projection (for FCF)",
             min_value=0.0,
             max_value=100.0,
-            value=8.0,
-            help="Percent of revenue reinvested back each year."
+            value=float(loaded["reinvest_pct"]),
+            help="Percent of revenue reinvested back each year.",
+            key=f"reinvest_pct_{ver}"
         )
-        reinvest_proj = reinvest_proj_pct / 100.0
+
+    projection_inputs = dict(
+        base_rev=base_rev,
+        growth_pct=growth_pct,
+        ebitda_start_pct=ebitda_start_pct_proj,
+        ebitda_growth_pct=ebitda_growth_pct_proj,
+        reinvest_pct=reinvest_proj_pct,
+        years=int(projection_years),
+        invest=invest,
+        equity_pct=equity_pct,
+        multiple=multiple,
+        discount_rate_pct=discount_rate_pct
+    )
+
+    s1, s2 = st.columns([3, 1])
+    with s1:
+        save_name = st.text_input("Scenario Name")
+    with s2:
+        st.write("")
+        if st.button("Save Scenario"):
+            if save_name.strip():
+                store.save(save_name.strip(), projection_inputs)
+                st.success(f"Saved scenario '{save_name.strip()}'.")
+            else:
+                st.error("Please enter a scenario name.")
 
     if st.button("Run Projection"):
         if base_rev <= 0:
             st.error("Base Revenue should be greater than zero for a meaningful projection.")
         else:
-            years_proj = np.arange(1, int(projection_years) + 1)
-
-            rev_list = []
-            ebit_list = []
-            ebit_margin_list = []
-            fcf_list = []
-
-            cur_rev = base_rev
-            cur_margin = ebitda_start_proj
-
-            for _ in years_proj:
-                rev_list.append(cur_rev)
-                ebit = cur_rev * cur_margin
-                ebit_list.append(ebit)
-                ebit_margin_list.append(cur_margin * 100)
-
-                fcf_t = ebit - (cur_rev * reinvest_proj)
-                fcf_list.append(fcf_t)
-
-                cur_rev = cur_rev * (1 + growth)
-                cur_margin = cur_margin * (1 + ebitda_growth_proj)
-
-            proj = pd.DataFrame({
-                "Year": years_proj,
-                "Revenue (₹)": rev_list,
-                "EBITDA (₹)": ebit_list,
-                "EBITDA %": ebit_margin_list,
-                "FCF (₹)": fcf_list
-            })
+            # Served from the input-hash cache when this exact scenario was computed before
+            proj, outcome = store.results(projection_inputs)
+            st.session_state["last_projection"] = (dict(projection_inputs), proj)
 
-            proj["Valuation (₹)"] = proj["EBITDA (₹)"] * multiple
-
-            # DCF Valuation: discount FCF each year + discounted terminal value
-            dcf_value = 0.0
-            for i, row in proj.iterrows():
-                year_index = int(row["Year"])
-                fcf_t = row["FCF (₹)"]
-                dcf_value += fcf_t / ((1 + discount_rate) ** year_index)
-
-            terminal_value = proj["Valuation (₹)"].iloc[-1]
-            dcf_value += terminal_value / ((1 + discount_rate) ** years_proj[-1])
+            terminal_value = outcome["terminal_value"]
+            dcf_value = outcome["dcf_value"]
 
             st.write("### Projection Table (Revenue, EBITDA, FCF, Valuation)")
             st.dataframe(
@@ -914,7 +1699,8 @@ with tab3:
             )
 
             # Projection chart: Revenue vs EBITDA%
-            fig_proj = combo_chart_plotly(
+            fig_proj = cached_figure(
+                combo_chart_plotly,
                 proj,
                 x_col="Year",
                 bar_col="Revenue (₹)",
@@ -927,15 +1713,11 @@ with tab3:
             # =====================================================
             # INVESTOR OUTCOME (TERMINAL VALUE, ROI, IRR, DCF)
             # =====================================================
-            investor_payout = terminal_value * equity
+            investor_payout = outcome["payout"]
 
             if invest > 0:
-                roi = (investor_payout - invest) / invest
-                try:
-                    cash_flows = [-invest] + [0] * (len(years_proj) - 1) + [investor_payout]
-                    irr_value = nf.irr(cash_flows)
-                except Exception:
-                    irr_value = np.nan
+                roi = outcome["roi"]
+                irr_value = outcome["irr"]
             else:
                 roi = 0.0
                 irr_value = np.nan
@@ -1070,3 +1852,49 @@ with tab3:
                     f"<div class='card'><b>Insight {idx}.</b> {text}</div>",
                     unsafe_allow_html=True
                 )
+
+    # =========================================================
+    # EXPORT (ROLLUPS, METRICS, FUNNEL, P&L, PROJECTION)
+    # =========================================================
+    st.markdown("<div class='section-title'>Export</div>", unsafe_allow_html=True)
+
+    # The projection table is resolved only when an export is prepared
+    export_sources = {
+        "Monthly Revenue": monthly,
+        "Quarterly Revenue": quarterly,
+        "Annual Revenue": yearly,
+        "Financial Metrics": metrics_df,
+        "Funnel Metrics": funnel_df,
+        f"{pnl_grain} P&L": pnl,
+        "Projection": None,
+    }
+
+    e1, e2 = st.columns([3, 1])
+    with e1:
+        export_names = st.multiselect("Tables to Export", list(export_sources), default=list(export_sources))
+    with e2:
+        export_fmt = st.radio("Format", list(EXPORT_FORMATS))
+
+    if st.button("Prepare Export"):
+        # Written chunk by chunk to a temp file; only the finished file is served
+        export_tables = {name: export_sources[name] for name in export_names}
+        if "Projection" in export_tables:
+            # Reuse the table from "Run Projection" when its inputs still match
+            last_inputs, last_proj = st.session_state.get("last_projection", (None, None))
+            export_tables["Projection"] = (
+                last_proj if last_inputs == projection_inputs else store.results(projection_inputs)[0]
+            )
+        with st.spinner("Writing export..."):
+            export_file = export_to_tempfile(export_tables, export_fmt)
+        # The replaced export's file is deleted now; the last one goes with the session
+        previous = st.session_state.get("export_file")
+        if previous is not None:
+            previous.release()
+        st.session_state["export_file"] = export_file
+        st.session_state["export_file_fmt"] = export_fmt
+
+    export_file = st.session_state.get("export_file")
+    if export_file is not None:
+        _, suffix, mime = EXPORT_FORMATS[st.session_state["export_file_fmt"]]
+        with open(export_file.path, "rb") as fh:
+            st.download_button("Download Export", data=fh, file_name=f"edtech_financials{suffix}", mime=mime)
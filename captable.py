@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# CAP TABLE (MULTI-ROUND, OPTION POOL TOP-UPS)
+# =========================================================
+# Rounds are priced on the fully diluted pre-money share count. A round's
+# pool_pct is the post-money option pool target; the top-up is created before
+# the round (pre-money), so it dilutes existing holders, not the new investor.
+DEFAULT_FOUNDER_SHARES = 10_000_000
+ROUND_COLUMNS = ["name", "investment", "pre_money", "pool_pct", "pref_multiple", "participating"]
+
+DEFAULT_ROUNDS = pd.DataFrame([
+    {"name": "Seed", "investment": 5_000_000.0, "pre_money": 20_000_000.0, "pool_pct": 10.0,
+     "pref_multiple": 1.0, "participating": False},
+    {"name": "Series A", "investment": 20_000_000.0, "pre_money": 80_000_000.0, "pool_pct": 12.0,
+     "pref_multiple": 1.0, "participating": False},
+], columns=ROUND_COLUMNS)
+
+
+def build_cap_table(rounds, founder_shares=DEFAULT_FOUNDER_SHARES, initial_pool_pct=0.0):
+    # rounds: DataFrame / list of dicts with ROUND_COLUMNS, in chronological order.
+    # Returns one row per holder: shares, ownership %, invested, liquidation preference,
+    # seniority (higher = paid first; later rounds are senior) and participation.
+    rounds = pd.DataFrame(rounds, columns=ROUND_COLUMNS)
+    founder_shares = float(founder_shares)
+    pool = founder_shares * initial_pool_pct / (100 - initial_pool_pct) if initial_pool_pct else 0.0
+
+    holders = []
+    for seniority, r in enumerate(rounds.itertuples(index=False), start=1):
+        investment, pre_money = float(r.investment), float(r.pre_money)
+        if investment <= 0 or pre_money <= 0:
+            raise ValueError(f"Round '{r.name}' needs a positive investment and pre-money valuation.")
+        post_money = pre_money + investment
+        existing = founder_shares + pool + sum(h["shares"] for h in holders)
+
+        # Pool top-up so the pool is pool_pct of post-money, issued pre-money:
+        # (pool + top_up) / post_shares = pool_pct, with post_shares = pre_shares × post / pre
+        target = float(r.pool_pct or 0) / 100
+        if target * post_money / pre_money >= 1:
+            raise ValueError(f"Round '{r.name}': option pool target is too large for this valuation.")
+        if target > 0:
+            pre_shares = (existing - pool) / (1 - target * post_money / pre_money)
+            pool = max(pool, pre_shares - (existing - pool))
+        pre_shares = founder_shares + pool + sum(h["shares"] for h in holders)
+
+        price = pre_money / pre_shares
+        holders.append({
+            "holder": str(r.name),
+            "class": "preferred",
+            "shares": investment / price,
+            "invested": investment,
+            "preference": investment * float(r.pref_multiple),
+            "seniority": seniority,
+            "participating": bool(r.participating),
+            "price": price,
+        })
+
+    table = pd.DataFrame(
+        [{"holder": "Founders", "class": "common", "shares": founder_shares, "invested": 0.0,
+          "preference": 0.0, "seniority": 0, "participating": False, "price": 0.0},
+         {"holder": "Option Pool", "class": "common", "shares": pool, "invested": 0.0,
+          "preference": 0.0, "seniority": 0, "participating": False, "price": 0.0}]
+        + holders
+    )
+    table.insert(3, "ownership_pct", table["shares"] / table["shares"].sum() * 100)
+    return table
+
+
+# =========================================================
+# EXIT WATERFALL (VECTORIZED OVER EXIT VALUES)
+# =========================================================
+CONVERSION_RTOL = 1e-9
+
+
+def _pay_preferences(exits, prefs, seniority, paying):
+    # Pays liquidation preferences senior-first (pari passu within a seniority level).
+    # exits: (n,), prefs: (h,) → (n, h) paid preference, (n,) remaining proceeds
+    paid = np.zeros((len(exits), len(prefs)))
+    remaining = exits.copy()
+    for level in np.unique(seniority[paying])[::-1]:
+        members = paying & (seniority == level)
+        due = prefs[members].sum()
+        if due <= 0:
+            continue
+        pay = np.minimum(remaining, due)
+        paid[:, members] = pay[:, None] * (prefs[members] / due)
+        remaining = remaining - pay
+    return paid, remaining
+
+
+def waterfall(cap_table, exit_values):
+    # Payout per holder for every exit value → DataFrame (exits × holders).
+    # Non-participating preferred takes the greater of its preference or converting
+    # to common. Series convert in order of preference per share, so only K + 1
+    # conversion sets are possible; each is evaluated for all exits at once. The
+    # outcome is the largest set whose last series gains (within rounding) by
+    # converting; the next series then never does, so one set always applies.
+    exits = np.maximum(np.atleast_1d(np.asarray(exit_values, dtype=float)), 0.0)
+    shares = cap_table["shares"].to_numpy(dtype=float)
+    prefs = cap_table["preference"].to_numpy(dtype=float)
+    seniority = cap_table["seniority"].to_numpy()
+    preferred = (cap_table["class"] == "preferred").to_numpy()
+    participating = cap_table["participating"].to_numpy(dtype=bool) & preferred
+    convertible = preferred & ~participating
+
+    order = np.flatnonzero(convertible)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pref_per_share = np.where(shares > 0, prefs / shares, np.inf)
+    order = order[np.argsort(pref_per_share[order], kind="stable")]
+
+    h = len(shares)
+    for k in range(len(order) + 1):
+        converted = np.zeros(h, dtype=bool)
+        converted[order[:k]] = True
+        paying = preferred & ~converted
+        paid, remaining = _pay_preferences(exits, prefs, seniority, paying)
+
+        # Residual shared as-converted by common, converted and participating shares
+        sharing = ~preferred | converted | participating
+        price = remaining / shares[sharing].sum()
+        candidate = paid + price[:, None] * np.where(sharing, shares, 0.0)
+
+        # At the exact conversion price both choices pay the same, so a relative
+        # tolerance keeps float rounding from rejecting every set
+        if k == 0:
+            payouts = candidate
+        else:
+            take = price >= pref_per_share[order[k - 1]] * (1 - CONVERSION_RTOL)
+            payouts[take] = candidate[take]
+
+    return pd.DataFrame(payouts, columns=cap_table["holder"].tolist(), index=pd.Index(exits, name="exit_value"))
+
+
+def holder_returns(cap_table, payouts):
+    # Multiple on invested capital per holder at each exit (NaN for holders with no investment)
+    invested = cap_table["invested"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        moic = payouts.to_numpy() / np.where(invested > 0, invested, np.nan)
+    return pd.DataFrame(moic, columns=payouts.columns, index=payouts.index)
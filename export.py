@@ -0,0 +1,171 @@
+import os
+import tempfile
+import weakref
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from finance import project
+
+# =========================================================
+# CONSTANT-MEMORY EXPORT (CSV / PARQUET / XLSX)
+# =========================================================
+# Tables are written chunk by chunk straight to disk, so a multi-million-row
+# sweep never exists as one DataFrame or one in-memory workbook.
+EXPORT_FORMATS = {
+    "CSV (zip)": ("csv", ".zip", "application/zip"),
+    "Parquet (zip)": ("parquet", ".zip", "application/zip"),
+    "Excel (XLSX)": ("xlsx", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+DEFAULT_CHUNK_ROWS = 100_000
+XLSX_MAX_ROWS = 1_048_576
+
+
+def iter_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # A DataFrame is sliced; anything else is treated as an iterable of DataFrames
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, max(len(source), 1), chunk_rows):
+            yield source.iloc[start:start + chunk_rows]
+    else:
+        yield from source
+
+
+def _safe_name(name):
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name).strip("_") or "table"
+
+
+def _write_csv_zip(tables, path, chunk_rows):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, source in tables.items():
+            with zf.open(f"{_safe_name(name)}.csv", "w") as raw:
+                header = True
+                for chunk in iter_chunks(source, chunk_rows):
+                    raw.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+                    header = False
+
+
+def _write_parquet_zip(tables, path, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, source in tables.items():
+            part = os.path.join(tmp, f"{_safe_name(name)}.parquet")
+            writer = None
+            try:
+                for chunk in iter_chunks(source, chunk_rows):
+                    batch = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(part, batch.schema)
+                    writer.write_table(batch.cast(writer.schema))
+            finally:
+                if writer is not None:
+                    writer.close()
+            if os.path.exists(part):
+                zf.write(part, arcname=os.path.basename(part))
+                os.remove(part)
+
+
+def _cell(value):
+    # openpyxl cannot store numpy scalars, NaN or pandas timestamps with tz
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.tz_localize(None).to_pydatetime() if value.tzinfo else value.to_pydatetime()
+    return value
+
+
+def _write_xlsx(tables, path, chunk_rows):
+    from openpyxl import Workbook
+
+    # write_only → rows are streamed to disk as they are appended
+    wb = Workbook(write_only=True)
+    for name, source in tables.items():
+        base = _safe_name(name)[:28]
+        ws, rows_in_sheet, part, header = None, 0, 1, None
+        for chunk in iter_chunks(source, chunk_rows):
+            if header is None:
+                header = [str(c) for c in chunk.columns]
+            for row in chunk.itertuples(index=False, name=None):
+                if ws is None or rows_in_sheet >= XLSX_MAX_ROWS:
+                    # Spill to a continuation sheet past Excel's row limit
+                    ws = wb.create_sheet(base if part == 1 else f"{base}_{part}")
+                    ws.append(header)
+                    rows_in_sheet, part = 1, part + 1
+                ws.append([_cell(v) for v in row])
+                rows_in_sheet += 1
+        if ws is None:
+            ws = wb.create_sheet(base)
+            if header:
+                ws.append(header)
+    wb.save(path)
+
+
+def export_tables(tables, fmt, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    kind = EXPORT_FORMATS[fmt][0]
+    if kind == "csv":
+        _write_csv_zip(tables, path, chunk_rows)
+    elif kind == "parquet":
+        _write_parquet_zip(tables, path, chunk_rows)
+    else:
+        _write_xlsx(tables, path, chunk_rows)
+    return path
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class TempExport:
+    # Owns one finished export file: it is deleted on release(), or when the last
+    # reference (session state entry, job result) is dropped, or at interpreter exit
+
+    def __init__(self, path):
+        self.path = path
+        self._finalizer = weakref.finalize(self, _remove_quietly, path)
+
+    def release(self):
+        self._finalizer()
+
+
+def export_to_tempfile(tables, fmt, chunk_rows=DEFAULT_CHUNK_ROWS):
+    suffix = EXPORT_FORMATS[fmt][1]
+    fd, path = tempfile.mkstemp(prefix="edtech_export_", suffix=suffix)
+    os.close(fd)
+    try:
+        return TempExport(export_tables(tables, fmt, path, chunk_rows))
+    except BaseException:
+        # Failed or cancelled exports leave no partial file behind
+        os.remove(path)
+        raise
+
+
+# =========================================================
+# SCENARIO SWEEP (GENERATED CHUNK BY CHUNK)
+# =========================================================
+def sweep_chunks(inputs, sweep_input, lo, hi, steps, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # Evaluates the projection engine over `steps` evenly spaced values of one input.
+    # Values are generated per chunk, so memory is bounded by chunk_rows.
+    steps = int(steps)
+    span = (hi - lo) / (steps - 1) if steps > 1 else 0.0
+    for start in range(0, steps, chunk_rows):
+        xs = lo + span * np.arange(start, min(start + chunk_rows, steps))
+        trial = dict(inputs)
+        trial[sweep_input] = xs
+        res = project(**trial)
+        yield pd.DataFrame({
+            sweep_input: xs,
+            "Terminal Value (₹)": res["terminal_value"],
+            "Investor Payout (₹)": res["payout"],
+            "ROI %": res["roi"] * 100,
+            "IRR %": res["irr"] * 100,
+            "Payout Multiple (×)": res["payout_multiple"],
+            "DCF Valuation (₹)": res["dcf_value"],
+        })
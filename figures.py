@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# =========================================================
+# SHARED PLOTLY LAYOUT TEMPLATE (BUILT ONCE PER PROCESS)
+# =========================================================
+PLOT_TEMPLATE = "edtech"
+_TEMPLATE_LOCK = threading.Lock()
+
+
+def get_plot_template():
+    # plotly_white plus the dashboards' font, registered once by name so every
+    # figure references it instead of resolving and copying a template on each build
+    with _TEMPLATE_LOCK:
+        if PLOT_TEMPLATE not in pio.templates:
+            template = go.layout.Template(pio.templates["plotly_white"])
+            template.layout.update(
+                font=dict(family="Inter, sans-serif"),
+                hoverlabel=dict(font=dict(family="Inter, sans-serif")),
+            )
+            pio.templates[PLOT_TEMPLATE] = template
+    return PLOT_TEMPLATE
+
+
+# =========================================================
+# FIGURE CACHE (KEYED BY INPUT DATA + CHART PARAMETERS)
+# =========================================================
+# Entries are the figure's JSON string (fig.to_json()), shared by every session
+# in the process. A hit returns a freshly parsed dict for st.plotly_chart, so
+# reruns skip building and validating the figure, and callers never share an object.
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", "256"))
+
+
+def _digest_part(h, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        labels = list(value.columns) if isinstance(value, pd.DataFrame) else value.name
+        h.update(repr((type(value).__name__, labels, value.shape)).encode("utf-8"))
+        if len(value):
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode("utf-8"))
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}:{len(value)}".encode("utf-8"))
+        for v in value:
+            _digest_part(h, v)
+    elif isinstance(value, dict):
+        for k in sorted(value, key=repr):
+            h.update(repr(k).encode("utf-8"))
+            _digest_part(h, value[k])
+    else:
+        h.update(repr(value).encode("utf-8"))
+    h.update(b"|")
+
+
+def figure_key(name, *args, **kwargs):
+    h = hashlib.sha256(name.encode("utf-8"))
+    _digest_part(h, args)
+    _digest_part(h, kwargs)
+    return h.hexdigest()
+
+
+class FigureCache:
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()   # key → figure JSON string
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, builder, *args, **kwargs):
+        # Streamlit runs every page as __main__, so builders are told apart by source file
+        key = figure_key(f"{builder.__code__.co_filename}:{builder.__qualname__}", *args, **kwargs)
+        with self._lock:
+            spec = self._figures.get(key)
+            if spec is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if spec is None:
+            spec = builder(*args, **kwargs).to_json()
+            with self._lock:
+                self._figures[key] = spec
+                while len(self._figures) > self.max_entries:
+                    self._figures.popitem(last=False)
+        return json.loads(spec)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._figures), "hits": self.hits, "misses": self.misses}
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_figure_cache():
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = FigureCache()
+        return _CACHE
+
+
+def cached_figure(builder, *args, **kwargs):
+    return get_figure_cache().get_or_build(builder, *args, **kwargs)
@@ -0,0 +1,265 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# METRIC ENGINE (MODE A / MODE B)
+# =========================================================
+# Mode A — fixed industry assumptions
+MODE_A = {"op_cost_pct": 22.0, "opex_pct": 52.0, "reinvest_pct": 8.0}
+
+
+def metric_block(revenue, op_cost_pct=22.0, opex_pct=52.0, reinvest_pct=8.0):
+    # Works on a scalar or on a whole revenue column (one value per period)
+    rev = np.asarray(revenue, dtype=float)
+
+    operational_cost = rev * (op_cost_pct / 100)
+    opex = rev * (opex_pct / 100)
+    gross_profit = rev - operational_cost
+    ebitda = rev - operational_cost - opex
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gross_margin_pct = np.where(rev > 0, gross_profit / rev * 100, 0.0)
+        ebitda_margin_pct = np.where(rev > 0, ebitda / rev * 100, 0.0)
+
+    # Net Profit ≈ revenue × EBITDA Margin %
+    net_profit = rev * (ebitda_margin_pct / 100)
+    net_profit_margin_pct = np.where(rev > 0, ebitda_margin_pct, 0.0)
+
+    # FCF ≈ Net Profit − revenue × reinvestment%
+    fcf = net_profit - rev * (reinvest_pct / 100)
+
+    # Burn: if EBITDA < 0 → company is burning
+    burn_rate = np.where(ebitda < 0, -ebitda, 0.0)
+    approx_burn = rev * ((op_cost_pct + opex_pct) / 100 - 1)
+
+    return {
+        "revenue": rev,
+        "operational_cost": operational_cost,
+        "gross_profit": gross_profit,
+        "gross_margin_pct": gross_margin_pct,
+        "opex": opex,
+        "ebitda": ebitda,
+        "ebitda_margin_pct": ebitda_margin_pct,
+        "net_profit": net_profit,
+        "net_profit_margin_pct": net_profit_margin_pct,
+        "fcf": fcf,
+        "burn_rate": burn_rate,
+        "approx_burn": approx_burn,
+    }
+
+
+def runway(cash, burn_rate):
+    burn = np.asarray(burn_rate, dtype=float)
+    with np.errstate(divide="ignore"):
+        return np.where(burn > 0, cash / burn, np.inf)
+
+
+# =========================================================
+# P&L TIME SERIES (METRIC BLOCK PER PERIOD)
+# =========================================================
+PNL_COLUMNS = {
+    "revenue": "Revenue (₹)",
+    "operational_cost": "Operational Cost (₹)",
+    "gross_profit": "Gross Profit (₹)",
+    "gross_margin_pct": "Gross Margin %",
+    "opex": "OPEX (₹)",
+    "ebitda": "EBITDA (₹)",
+    "ebitda_margin_pct": "EBITDA Margin %",
+    "net_profit": "Net Profit (₹)",
+    "fcf": "FCF (₹)",
+    "burn_rate": "Burn (₹)",
+}
+
+
+def pnl_series(rollup, period_col, op_cost_pct, opex_pct, reinvest_pct,
+               cash=0.0, months_per_period=1, revenue_col="Revenue (₹)"):
+    # Evaluates the metric block as whole columns over a monthly/quarterly rollup
+    block = metric_block(rollup[revenue_col].to_numpy(dtype=float), op_cost_pct, opex_pct, reinvest_pct)
+
+    pnl = pd.DataFrame({period_col: rollup[period_col].to_numpy()})
+    for key, label in PNL_COLUMNS.items():
+        pnl[label] = block[key]
+    pnl["Runway (Months)"] = runway(cash, block["burn_rate"] / months_per_period)
+    return pnl
+
+
+# =========================================================
+# N-YEAR PROJECTION ENGINE (VECTORIZED OVER SCENARIOS)
+# =========================================================
+# Inputs use the same units as the dashboards (percent fields in %)
+PROJECTION_INPUTS = [
+    "base_rev", "growth_pct", "ebitda_start_pct", "ebitda_growth_pct", "reinvest_pct",
+    "years", "invest", "equity_pct", "multiple", "discount_rate_pct",
+]
+
+
+def project(base_rev, growth_pct, ebitda_start_pct, ebitda_growth_pct, reinvest_pct,
+            years, invest, equity_pct, multiple, discount_rate_pct):
+    # Every input may be a scalar or a 1-D array of scenarios (years must be a single int).
+    # Year t revenue = base × (1+g)^(t−1); margin compounds the same way.
+    years = int(years)
+    args = np.broadcast_arrays(*[np.atleast_1d(np.asarray(v, dtype=float)) for v in (
+        base_rev, growth_pct, ebitda_start_pct, ebitda_growth_pct, reinvest_pct,
+        invest, equity_pct, multiple, discount_rate_pct
+    )])
+    base, g, m0, mg, reinvest, invest, equity, mult, r = [a[:, None] for a in args]
+
+    t = np.arange(years)
+    revenue = base * (1 + g / 100) ** t
+    margin = (m0 / 100) * (1 + mg / 100) ** t
+    ebitda = revenue * margin
+    fcf = ebitda - revenue * (reinvest / 100)
+    valuation = ebitda * mult
+
+    terminal_value = valuation[:, -1]
+    discount = (1 + r / 100) ** (t + 1)
+    dcf_value = (fcf / discount).sum(axis=1) + terminal_value / discount[:, -1]
+
+    invest = invest[:, 0]
+    payout = terminal_value * (equity[:, 0] / 100)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(invest > 0, (payout - invest) / invest, np.nan)
+        payout_multiple = np.where(invest > 0, payout / invest, np.nan)
+        # Cash flows are [-invest, 0, …, 0, payout] → IRR has a closed form
+        irr = np.where((invest > 0) & (payout >= 0), payout_multiple ** (1 / years) - 1, np.nan)
+
+    return {
+        "revenue": revenue,
+        "ebitda": ebitda,
+        "ebitda_pct": margin * 100,
+        "fcf": fcf,
+        "valuation": valuation,
+        "terminal_value": terminal_value,
+        "payout": payout,
+        "roi": roi,
+        "irr": irr,
+        "payout_multiple": payout_multiple,
+        "dcf_value": dcf_value,
+    }
+
+
+def projection_table(**inputs):
+    # Single-scenario projection as the Year-by-Year table shown in the dashboards
+    res = project(**inputs)
+    proj = pd.DataFrame({
+        "Year": np.arange(1, int(inputs["years"]) + 1),
+        "Revenue (₹)": res["revenue"][0],
+        "EBITDA (₹)": res["ebitda"][0],
+        "EBITDA %": res["ebitda_pct"][0],
+        "FCF (₹)": res["fcf"][0],
+        "Valuation (₹)": res["valuation"][0],
+    })
+    summary = {k: float(res[k][0]) for k in
+               ["terminal_value", "payout", "roi", "irr", "payout_multiple", "dcf_value"]}
+    return proj, summary
+
+
+# =========================================================
+# GOAL SEEK (BRACKETED ROOT FINDING ON THE ENGINE)
+# =========================================================
+GOAL_METRICS = {
+    "Investor IRR (%)": ("irr", 100.0),
+    "ROI (%)": ("roi", 100.0),
+    "Payout Multiple (×)": ("payout_multiple", 1.0),
+    "DCF Valuation (₹)": ("dcf_value", 1.0),
+}
+
+
+def goal_seek(inputs, solve_for, metric, target, lo, hi, batch=64, tol=1e-9, max_rounds=12):
+    # Each round evaluates `batch` candidates across the bracket in one engine call,
+    # keeps the first sub-interval where (metric − target) changes sign, and repeats.
+    # Returns (value, achieved metric); value is None when the target is not bracketed,
+    # in which case achieved is the closest the range gets.
+    key, scale = GOAL_METRICS[metric]
+    target = target / scale
+    bracketed = False
+    best_x, best_gap = None, np.inf
+
+    for _ in range(max_rounds):
+        xs = np.linspace(lo, hi, batch)
+        trial = dict(inputs)
+        trial[solve_for] = xs
+        gap = project(**trial)[key] - target
+
+        finite = np.isfinite(gap)
+        if finite.any():
+            i = int(np.argmin(np.where(finite, np.abs(gap), np.inf)))
+            if abs(gap[i]) < best_gap:
+                best_x, best_gap = xs[i], abs(gap[i])
+
+        sign = np.sign(gap)
+        cross = np.flatnonzero(finite[:-1] & finite[1:] & (sign[:-1] * sign[1:] <= 0))
+        if len(cross) == 0:
+            break
+        bracketed = True
+        j = cross[0]
+        lo, hi = xs[j], xs[j + 1]
+        # Linear interpolation inside the final bracket
+        g_lo, g_hi = gap[j], gap[j + 1]
+        best_x = lo if g_hi == g_lo else lo - g_lo * (hi - lo) / (g_hi - g_lo)
+        best_gap = 0.0
+        if hi - lo < tol:
+            break
+
+    if best_x is None:
+        return None, np.nan
+    trial = dict(inputs)
+    trial[solve_for] = best_x
+    achieved = float(project(**trial)[key][0]) * scale
+    return (float(best_x) if bracketed else None), achieved
+
+
+# =========================================================
+# MONTHLY CASH & RUNWAY SIMULATOR (DETERMINISTIC OR MONTE CARLO)
+# =========================================================
+MAX_SIM_MONTHS = 240
+
+
+def simulate_cash(monthly_revenue, growth_pct, ebitda_start_pct, ebitda_growth_pct, reinvest_pct,
+                  cash, months=60, funding=0.0, funding_month=None, paths=1,
+                  growth_vol_pct=0.0, margin_vol_pct=0.0, seed=0):
+    # Annual growth / margin-improvement rates compound monthly. With paths > 1 and a
+    # volatility, monthly revenue growth gets lognormal shocks (annualised vol) and the
+    # margin gets independent monthly noise (in % points). Funding arrives at the start
+    # of funding_month (1-based). All outputs are (paths × months) arrays.
+    months = int(min(max(months, 1), MAX_SIM_MONTHS))
+    paths = int(max(paths, 1))
+    t = np.arange(months)
+    rng = np.random.default_rng(seed)
+
+    sigma = growth_vol_pct / 100 / np.sqrt(12)
+    drift = np.log1p(growth_pct / 100) / 12 - 0.5 * sigma ** 2
+    steps = np.full((paths, months), drift)
+    if sigma > 0:
+        steps += sigma * rng.standard_normal((paths, months))
+    steps[:, 0] = 0.0
+    revenue = monthly_revenue * np.exp(np.cumsum(steps, axis=1))
+
+    margin = (ebitda_start_pct / 100) * (1 + ebitda_growth_pct / 100) ** (t / 12)
+    margin = np.broadcast_to(margin, (paths, months))
+    if margin_vol_pct > 0:
+        margin = margin + (margin_vol_pct / 100) * rng.standard_normal((paths, months))
+
+    cash_flow = revenue * (margin - reinvest_pct / 100)
+    injection = np.where(t + 1 >= funding_month, funding, 0.0) if funding_month else np.zeros(months)
+    balance = cash + np.cumsum(cash_flow, axis=1) + injection
+
+    # Runway = months fully funded before the balance first goes negative (∞ if never)
+    short = balance < 0
+    runway_months = np.where(short.any(axis=1), short.argmax(axis=1), np.inf)
+
+    return {
+        "revenue": revenue,
+        "ebitda_pct": margin * 100,
+        "cash_flow": cash_flow,
+        "cash": balance,
+        "runway_months": runway_months,
+    }
+
+
+def runway_summary(runway_months, quantiles=(0.1, 0.5, 0.9)):
+    # Quantiles without interpolation, so paths that never run out (∞) are handled exactly
+    rm = np.asarray(runway_months, dtype=float)
+    out = {f"p{int(q * 100)}": float(np.quantile(rm, q, method="inverted_cdf")) for q in quantiles}
+    out["prob_out_of_cash"] = float(np.isfinite(rm).mean())
+    return out
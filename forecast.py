@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# LOG-LINEAR TREND (GROWTH RATE + CONFIDENCE INTERVAL)
+# =========================================================
+Z_95 = 1.96
+
+
+def fit_log_linear(revenue, periods_per_year=12):
+    # OLS of log(revenue) on time; zero/negative periods are ignored
+    y = np.asarray(revenue, dtype=float)
+    t = np.arange(len(y), dtype=float)
+    ok = y > 0
+    if ok.sum() < 3:
+        return None
+
+    t, log_y = t[ok], np.log(y[ok])
+    t_mean = t.mean()
+    sxx = ((t - t_mean) ** 2).sum()
+    slope = ((t - t_mean) * (log_y - log_y.mean())).sum() / sxx
+    intercept = log_y.mean() - slope * t_mean
+
+    resid = log_y - (intercept + slope * t)
+    dof = max(len(t) - 2, 1)
+    se = np.sqrt((resid ** 2).sum() / dof / sxx)
+
+    def annual(b):
+        return (np.exp(b * periods_per_year) - 1) * 100
+
+    return {
+        "slope": slope,
+        "intercept": intercept,
+        "period_growth_pct": (np.exp(slope) - 1) * 100,
+        "annual_growth_pct": annual(slope),
+        "annual_growth_low_pct": annual(slope - Z_95 * se),
+        "annual_growth_high_pct": annual(slope + Z_95 * se),
+    }
+
+
+# =========================================================
+# HOLT-WINTERS (ADDITIVE TREND + SEASONALITY)
+# =========================================================
+HW_GRID = np.linspace(0.05, 0.95, 10)
+
+
+def fit_holt_winters(revenue, season=12, grid=HW_GRID):
+    # Grid search over (alpha, beta, gamma). The recursion runs once over time
+    # with every parameter combination updated together as array columns.
+    y = np.asarray(revenue, dtype=float)
+    n = len(y)
+    if n < 3:
+        return None
+
+    seasonal = n >= 2 * season
+    if seasonal:
+        a, b, g = np.meshgrid(grid, grid, grid, indexing="ij")
+        level0 = y[:season].mean()
+        trend0 = (y[season:2 * season].mean() - level0) / season
+        seas0 = y[:season] - level0
+    else:
+        season = 1
+        a, b = np.meshgrid(grid, grid, indexing="ij")
+        g = np.zeros_like(a)
+        level0 = y[0]
+        trend0 = y[1] - y[0]
+        seas0 = np.zeros(1)
+
+    a, b, g = a.ravel(), b.ravel(), g.ravel()
+    n_params = len(a)
+    level = np.full(n_params, level0)
+    trend = np.full(n_params, trend0)
+    seas = np.tile(seas0, (n_params, 1))
+    sse = np.zeros(n_params)
+
+    for t in range(n):
+        s = t % season
+        err = y[t] - (level + trend + seas[:, s])
+        sse += err ** 2
+        new_level = a * (y[t] - seas[:, s]) + (1 - a) * (level + trend)
+        trend = b * (new_level - level) + (1 - b) * trend
+        seas[:, s] = g * (y[t] - new_level) + (1 - g) * seas[:, s]
+        level = new_level
+
+    best = int(np.argmin(sse))
+    return {
+        "alpha": a[best],
+        "beta": b[best],
+        "gamma": g[best],
+        "season": season,
+        "n_obs": n,
+        "level": level[best],
+        "trend": trend[best],
+        "seasonals": seas[best].copy(),
+        "sigma": np.sqrt(sse[best] / n),
+    }
+
+
+def forecast_holt_winters(params, horizon=12):
+    h = np.arange(1, horizon + 1)
+    season_idx = (params["n_obs"] + h - 1) % params["season"]
+    point = params["level"] + h * params["trend"] + params["seasonals"][season_idx]
+    band = Z_95 * params["sigma"] * np.sqrt(h)
+    return pd.DataFrame({
+        "step": h,
+        "Forecast (₹)": np.maximum(point, 0.0),
+        "Lower (₹)": np.maximum(point - band, 0.0),
+        "Upper (₹)": point + band,
+    })
+
+
+def calibrate(revenue, horizon=12, season=12):
+    # Everything the projection inputs need from the monthly history, in one call
+    trend = fit_log_linear(revenue, periods_per_year=season)
+    hw = fit_holt_winters(revenue, season=season)
+    fc = forecast_holt_winters(hw, horizon) if hw is not None else None
+    return {"trend": trend, "holt_winters": hw, "forecast": fc}
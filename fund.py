@@ -0,0 +1,229 @@
+import os
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+
+from analytics import MONTH_NAMES, DEFAULT_FY_START
+from portfolio import PORTFOLIO_INPUTS_FILE, PORTFOLIO_WORKERS, ledger_files, run_portfolio
+from figures import get_plot_template
+
+# Shared Plotly layout template, registered once per process
+PLOT_TEMPLATE = get_plot_template()
+
+# ----------------------------------------------------------
+# HEADER & LOGO
+# ----------------------------------------------------------
+logo_url = "https://raw.githubusercontent.com/Analytics-Avenue/streamlit-dataapp/main/logo.png"
+
+st.markdown(f"""
+<div style="display: flex; align-items: center; margin-bottom:16px;">
+    <img src="{logo_url}" width="60" style="margin-right:12px;">
+    <div style="line-height:1;">
+        <div style="color:#064b86; font-size:36px; font-weight:700;">Analytics Avenue &</div>
+        <div style="color:#064b86; font-size:36px; font-weight:700;">Advanced Analytics</div>
+    </div>
+</div>
+""", unsafe_allow_html=True)
+
+# ----------------------------------------------------------
+# PAGE CONFIG
+# ----------------------------------------------------------
+st.set_page_config(
+    page_title="Fund Portfolio Dashboard",
+    layout="wide"
+)
+
+# Hide sidebar
+st.markdown("""
+<style>
+[data-testid="stSidebarNav"] {display:none;}
+section[data-testid="stSidebar"] {display:none;}
+</style>
+""", unsafe_allow_html=True)
+
+# ----------------------------------------------------------
+# GLOBAL UI CSS (SAME AS MAIN APP)
+# ----------------------------------------------------------
+st.markdown("""
+<style>
+* { font-family:'Inter', sans-serif; }
+body, [class*="css"] { color:#000 !important; font-size:16px; }
+
+/* MAIN HEADER */
+.big-header {
+    font-size: 32px;
+    font-weight: 700;
+    color: #000;
+    margin-bottom: 10px;
+}
+
+/* SECTION TITLE */
+.section-title {
+    font-size: 22px;
+    font-weight: 600;
+    margin-top: 28px;
+    margin-bottom: 10px;
+    position: relative;
+    color: #000;
+}
+.section-title:after {
+    content:"";
+    position:absolute;
+    bottom:-4px;
+    left:0;
+    height:2px;
+    width:0%;
+    background:#064b86;
+    transition:0.35s ease;
+}
+.section-title:hover:after { width:40%; }
+
+/* CARD */
+.card {
+    background:#ffffff;
+    padding:18px;
+    border-radius:12px;
+    border:1px solid #e5e5e5;
+    font-size:15.5px;
+    box-shadow:0 3px 12px rgba(0,0,0,0.06);
+    transition:all 0.25s ease;
+}
+.card:hover {
+    transform:translateY(-3px);
+    box-shadow:0 10px 22px rgba(6,75,134,0.18);
+    border-color:#064b86;
+}
+
+/* KPI */
+.kpi {
+    background:#ffffff;
+    padding:20px;
+    border-radius:12px;
+    border:1px solid #e2e2e2;
+    font-size:18px;
+    font-weight:600;
+    text-align:center;
+    color:#064b86;
+    box-shadow:0 3px 10px rgba(0,0,0,0.05);
+    transition:all 0.25s ease;
+}
+.kpi:hover {
+    transform:translateY(-4px);
+    box-shadow:0 12px 24px rgba(6,75,134,0.2);
+}
+
+/* Fade-in */
+.block-container { animation: fadeIn 0.4s ease; }
+@keyframes fadeIn {
+    from {opacity:0; transform:translateY(8px);}
+    to {opacity:1; transform:translateY(0);}
+}
+</style>
+""", unsafe_allow_html=True)
+
+
+# ----------------------------------------------------------
+# PORTFOLIO RUN (CACHED PER DIRECTORY STATE)
+# ----------------------------------------------------------
+def directory_state(directory):
+    # File names, sizes and mtimes: any change to a ledger or the inputs file changes this
+    paths = list(ledger_files(directory).values()) + [os.path.join(directory, PORTFOLIO_INPUTS_FILE)]
+    return tuple((p, os.stat(p).st_size, os.stat(p).st_mtime_ns) for p in paths if os.path.exists(p))
+
+
+@st.cache_data(show_spinner=False)
+def cached_portfolio(directory, fy_start, state):
+    # `state` is only part of the cache key; unchanged ledgers are also cached on disk
+    return run_portfolio(directory, fy_start)
+
+
+st.markdown("<div class='big-header'>Fund Portfolio Intelligence</div>", unsafe_allow_html=True)
+st.markdown(f"""
+<div class="card">
+Point this page at a directory of company ledgers (<b>&lt;company&gt;.csv</b>, same columns as the main
+dashboard) and an optional <b>{PORTFOLIO_INPUTS_FILE}</b> with one row per company
+(<b>company</b> plus any projection input, and optional <b>op_cost_pct</b> / <b>opex_pct</b> / <b>reinvest_pct</b>).
+Blank inputs default to the ledger's trailing-12-month revenue, its CAGR and the Mode A assumptions.
+Ledgers are processed in parallel across {PORTFOLIO_WORKERS} worker processes and cached, so a refresh
+only re-reads files that changed.
+</div>
+""", unsafe_allow_html=True)
+
+p1, p2 = st.columns([3, 1])
+with p1:
+    portfolio_dir = st.text_input("Portfolio Directory", value=os.environ.get("PORTFOLIO_DIR", "portfolio"))
+with p2:
+    fy_start = st.selectbox(
+        "Fiscal Year Starts In",
+        list(range(1, 13)),
+        index=DEFAULT_FY_START - 1,
+        format_func=lambda m: MONTH_NAMES[m - 1] + (" (calendar year)" if m == 1 else "")
+    )
+
+if not os.path.isdir(portfolio_dir):
+    st.info("Enter a directory containing company ledger CSVs to proceed.")
+    st.stop()
+
+with st.spinner("Processing company ledgers..."):
+    companies, fund, errors = cached_portfolio(portfolio_dir, fy_start, directory_state(portfolio_dir))
+
+for name, message in errors.items():
+    st.error(f"{name}: {message}")
+if companies.empty:
+    st.warning("No company ledgers could be processed in this directory.")
+    st.stop()
+
+# ----------------------------------------------------------
+# FUND-LEVEL RETURN
+# ----------------------------------------------------------
+st.markdown("<div class='section-title'>Fund-Level Return</div>", unsafe_allow_html=True)
+k1, k2, k3, k4, k5 = st.columns(5)
+k1.markdown(f"<div class='kpi'>Companies<br/>{fund['companies']}</div>", unsafe_allow_html=True)
+k2.markdown(f"<div class='kpi'>Capital Invested<br/>₹{fund['invested']:,.0f}</div>", unsafe_allow_html=True)
+k3.markdown(f"<div class='kpi'>Projected Payout<br/>₹{fund['payout']:,.0f}</div>", unsafe_allow_html=True)
+fund_moic_text = "—" if fund["invested"] <= 0 or np.isnan(fund["moic"]) else f"{fund['moic']:.2f}×"
+k4.markdown(f"<div class='kpi'>Fund MOIC<br/>{fund_moic_text}</div>", unsafe_allow_html=True)
+fund_irr_text = "N/A" if np.isnan(fund["irr"]) else f"{fund['irr'] * 100:.2f}%"
+k5.markdown(f"<div class='kpi'>Fund IRR<br/>{fund_irr_text}</div>", unsafe_allow_html=True)
+
+# ----------------------------------------------------------
+# COMPARATIVE TABLE
+# ----------------------------------------------------------
+st.markdown("<div class='section-title'>Company Comparison</div>", unsafe_allow_html=True)
+comparison = pd.DataFrame({
+    "Company": companies["company"],
+    "Rows": companies["rows"],
+    "Total Revenue (₹)": companies["total_revenue"],
+    "TTM Revenue (₹)": companies["ttm_revenue"],
+    "CAGR %": companies["cagr"] * 100,
+    "EBITDA (₹)": companies["ebitda"],
+    "Invested (₹)": companies["invest"],
+    "Equity %": companies["equity_pct"],
+    "Years": companies["years"],
+    "Terminal Value (₹)": companies["terminal_value"],
+    "Payout (₹)": companies["payout"],
+    "ROI %": companies["roi"] * 100,
+    "IRR %": companies["irr"] * 100,
+    "DCF Valuation (₹)": companies["dcf_value"],
+})
+st.dataframe(
+    comparison.style.format({
+        c: ("{:.2f}" if c.endswith("%") else "{:,.0f}") for c in comparison.columns if c != "Company"
+    }, na_rep="N/A"),
+    width="stretch"
+)
+
+fig = go.Figure()
+fig.add_trace(go.Bar(x=comparison["Company"], y=comparison["IRR %"], name="IRR %", marker_color="#064b86"))
+fig.add_trace(go.Bar(x=comparison["Company"], y=comparison["CAGR %"], name="Historical CAGR %", marker_color="#7fb3e0"))
+fig.update_layout(title="Projected IRR vs Historical CAGR", barmode="group", template=PLOT_TEMPLATE, yaxis_title="%")
+st.plotly_chart(fig, width="stretch")
+
+st.download_button(
+    "Download Comparison (CSV)",
+    data=comparison.to_csv(index=False).encode("utf-8"),
+    file_name="portfolio_comparison.csv",
+    mime="text/csv"
+)
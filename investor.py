@@ -1,9 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import numpy_financial as nf
 import plotly.graph_objects as go
 
+from finance import goal_seek, GOAL_METRICS
+from scenarios import ScenarioStore
+from export import EXPORT_FORMATS, DEFAULT_CHUNK_ROWS, export_to_tempfile, sweep_chunks
+from jobs import JobSession, get_job_manager, job_key, track
+from report import get_report_worker, investor_insights, zip_reports
+from captable import DEFAULT_FOUNDER_SHARES, DEFAULT_ROUNDS, build_cap_table, waterfall, holder_returns
+from figures import get_plot_template, cached_figure
+
+# Shared Plotly layout template, registered once per process
+PLOT_TEMPLATE = get_plot_template()
+
 # ----------------------------------------------------------
 # HEADER & LOGO
 # ----------------------------------------------------------
@@ -122,7 +132,7 @@ def combo_chart_plotly(df, x_col, bar_col, line_col, title, line_suffix="%"):
     fig = go.Figure()
     if df.empty:
         fig.add_annotation(text="No data", x=0.5, y=0.5, showarrow=False)
-        fig.update_layout(title=title, template="plotly_white")
+        fig.update_layout(title=title, template=PLOT_TEMPLATE)
         return fig
 
     colors = ["#2ecc71" if v >= 0 else "#e74c3c" for v in df[line_col]]
@@ -145,7 +155,7 @@ def combo_chart_plotly(df, x_col, bar_col, line_col, title, line_suffix="%"):
 
     fig.update_layout(
         title=title,
-        template="plotly_white",
+        template=PLOT_TEMPLATE,
         xaxis=dict(tickangle=-45),
         yaxis=dict(title=bar_col),
         yaxis2=dict(overlaying="y", side="right"),
@@ -153,6 +163,27 @@ def combo_chart_plotly(df, x_col, bar_col, line_col, title, line_suffix="%"):
     )
     return fig
 
+# ----------------------------------------------------------
+# SCENARIO STORE (ONE PER SERVER PROCESS)
+# ----------------------------------------------------------
+@st.cache_resource
+def get_scenario_store():
+    return ScenarioStore()
+
+
+DEFAULT_INPUTS = dict(
+    base_rev=600000.0,
+    growth_pct=25.0,
+    ebitda_start_pct=26.0,
+    ebitda_growth_pct=4.0,
+    reinvest_pct=8.0,
+    years=5,
+    invest=1000000.0,
+    equity_pct=20.0,
+    multiple=6.0,
+    discount_rate_pct=12.0
+)
+
 # ----------------------------------------------------------
 # MAIN TABS
 # ----------------------------------------------------------
@@ -180,7 +211,12 @@ with tab1:
     • Free cash flow (FCF) forecast<br>
     • Terminal valuation (EBITDA × Multiple)<br>
     • Investor payout simulation (equity stake)<br>
+    • Multi-round cap table with liquidation-preference exit waterfall<br>
     • ROI, IRR and DCF valuation<br>
+    • Goal seek for a target IRR / multiple / DCF<br>
+    • Saved scenarios with side-by-side comparison<br>
+    • Streamed CSV / Parquet / XLSX export of scenario sweeps<br>
+    • Self-contained HTML investor reports (single or batch)<br>
     • Automated investor insights<br>
     </div>
     """, unsafe_allow_html=True)
@@ -201,7 +237,12 @@ with tab2:
         ["Investor Capital", "Amount invested."],
         ["Equity Stake %", "Ownership granted to investor."],
         ["Exit Multiple", "EBITDA × multiple at exit."],
-        ["Discount Rate %", "Used for DCF valuation."]
+        ["Discount Rate %", "Used for DCF valuation."],
+        ["Goal Seek", "Solves one input for a target IRR, ROI, payout multiple or DCF."],
+        ["Pre-Money Valuation", "Company value before a round; sets the round's share price."],
+        ["Option Pool %", "Post-money pool target; the top-up is issued before the round."],
+        ["Liquidation Preference", "Multiple of the investment paid back before common at exit."],
+        ["Participating", "Preferred that takes its preference and also shares in the remainder."]
     ], columns=["Field", "Description"])
 
     st.dataframe(df_gloss, width="stretch")
@@ -211,73 +252,292 @@ with tab2:
 # ----------------------------------------------------------
 with tab3:
 
+    store = get_scenario_store()
+
+    # ------------------------------------------------------
+    # LOAD A SAVED SCENARIO
+    # ------------------------------------------------------
+    saved_names = store.names()
+    if saved_names:
+        l1, l2 = st.columns([3, 1])
+        with l1:
+            load_name = st.selectbox("Saved Scenarios", saved_names)
+        with l2:
+            st.write("")
+            if st.button("Load Scenario"):
+                st.session_state["loaded_inputs"] = store.load(load_name)
+                # New widget keys → widgets pick up the loaded values as defaults
+                st.session_state["inputs_version"] = st.session_state.get("inputs_version", 0) + 1
+                st.rerun()
+
+    loaded = st.session_state.get("loaded_inputs", DEFAULT_INPUTS)
+    ver = st.session_state.get("inputs_version", 0)
+
     st.markdown("<div class='section-title'>Projection Inputs</div>", unsafe_allow_html=True)
 
     # LEFT SIDE INPUTS
     c1, c2 = st.columns(2)
     with c1:
-        base_rev = st.number_input("Base Revenue (₹)", value=600000.0)
-        growth_pct = st.number_input("YoY Growth (%)", value=25.0)
-        ebitda_start_pct = st.number_input("Starting EBITDA Margin (%)", value=26.0)
-        ebitda_growth_pct = st.number_input("EBITDA Margin YoY Improvement (%)", value=4.0)
-        reinvest_pct = st.number_input("Reinvestment %", value=8.0)
+        base_rev = st.number_input("Base Revenue (₹)", value=float(loaded["base_rev"]), key=f"base_rev_{ver}")
+        growth_pct = st.number_input("YoY Growth (%)", value=float(loaded["growth_pct"]), key=f"growth_pct_{ver}")
+        ebitda_start_pct = st.number_input(
+            "Starting EBITDA Margin (%)", value=float(loaded["ebitda_start_pct"]), key=f"ebitda_start_pct_{ver}"
+        )
+        ebitda_growth_pct = st.number_input(
+            "EBITDA Margin YoY Improvement (%)", value=float(loaded["ebitda_growth_pct"]), key=f"ebitda_growth_pct_{ver}"
+        )
+        reinvest_pct = st.number_input("Reinvestment %", value=float(loaded["reinvest_pct"]), key=f"reinvest_pct_{ver}")
 
     with c2:
-        years = st.number_input("Projection Years", min_value=1, max_value=20, value=5)
-        invest = st.number_input("Investor Capital (₹)", value=1000000.0)
-        equity_pct = st.number_input("Equity Stake (%)", value=20.0)
-        multiple = st.number_input("Exit EBITDA Multiple", value=6.0)
-        discount_rate_pct = st.number_input("Discount Rate (%)", value=12.0)
+        years = st.number_input(
+            "Projection Years", min_value=1, max_value=20, value=int(loaded["years"]), key=f"years_{ver}"
+        )
+        invest = st.number_input("Investor Capital (₹)", value=float(loaded["invest"]), key=f"invest_{ver}")
+        equity_pct = st.number_input("Equity Stake (%)", value=float(loaded["equity_pct"]), key=f"equity_pct_{ver}")
+        multiple = st.number_input("Exit EBITDA Multiple", value=float(loaded["multiple"]), key=f"multiple_{ver}")
+        discount_rate_pct = st.number_input(
+            "Discount Rate (%)", value=float(loaded["discount_rate_pct"]), key=f"discount_rate_pct_{ver}"
+        )
+
+    projection_inputs = dict(
+        base_rev=base_rev,
+        growth_pct=growth_pct,
+        ebitda_start_pct=ebitda_start_pct,
+        ebitda_growth_pct=ebitda_growth_pct,
+        reinvest_pct=reinvest_pct,
+        years=years,
+        invest=invest,
+        equity_pct=equity_pct,
+        multiple=multiple,
+        discount_rate_pct=discount_rate_pct
+    )
+
+    # ------------------------------------------------------
+    # SAVE / COMPARE SCENARIOS
+    # ------------------------------------------------------
+    s1, s2 = st.columns([3, 1])
+    with s1:
+        save_name = st.text_input("Scenario Name")
+    with s2:
+        st.write("")
+        if st.button("Save Scenario"):
+            if save_name.strip():
+                store.save(save_name.strip(), projection_inputs)
+                st.success(f"Saved scenario '{save_name.strip()}'.")
+            else:
+                st.error("Please enter a scenario name.")
+
+    compare_names = st.multiselect("Compare Saved Scenarios", store.names())
+    if compare_names:
+        comparison = store.compare(compare_names)
+        st.dataframe(
+            comparison.style.format({
+                "Base Revenue (₹)": "{:,.0f}",
+                "YoY Growth %": "{:.2f}",
+                "Terminal Value (₹)": "{:,.0f}",
+                "Investor Payout (₹)": "{:,.0f}",
+                "ROI %": "{:.2f}",
+                "IRR %": "{:.2f}",
+                "DCF Valuation (₹)": "{:,.0f}"
+            }, na_rep="N/A"),
+            width="stretch"
+        )
+
+    # ------------------------------------------------------
+    # GOAL SEEK (SOLVE ONE INPUT FOR A TARGET OUTCOME)
+    # ------------------------------------------------------
+    st.markdown("<div class='section-title'>Goal Seek</div>", unsafe_allow_html=True)
+
+    # Input → (label, search bracket)
+    GOAL_INPUTS = {
+        "growth_pct": ("YoY Growth (%)", (-50.0, 300.0)),
+        "ebitda_start_pct": ("Starting EBITDA Margin (%)", (-50.0, 100.0)),
+        "ebitda_growth_pct": ("EBITDA Margin YoY Improvement (%)", (-50.0, 100.0)),
+        "base_rev": ("Base Revenue (₹)", (0.0, max(base_rev, 1.0) * 100)),
+        "multiple": ("Exit EBITDA Multiple", (0.5, 50.0)),
+        "equity_pct": ("Equity Stake (%)", (0.0, 100.0)),
+        "invest": ("Investor Capital (₹)", (1.0, max(invest, 1.0) * 100)),
+        "reinvest_pct": ("Reinvestment %", (0.0, 100.0)),
+        "discount_rate_pct": ("Discount Rate (%)", (0.0, 100.0)),
+    }
+
+    g1, g2, g3 = st.columns(3)
+    with g1:
+        seek_metric = st.selectbox("Target Outcome", list(GOAL_METRICS))
+    with g2:
+        seek_target = st.number_input("Target Value", value=35.0)
+    with g3:
+        seek_input = st.selectbox(
+            "Solve For",
+            list(GOAL_INPUTS),
+            format_func=lambda k: GOAL_INPUTS[k][0]
+        )
+
+    if st.button("Run Goal Seek"):
+        label, (lo, hi) = GOAL_INPUTS[seek_input]
+        solved, achieved = goal_seek(projection_inputs, seek_input, seek_metric, seek_target, lo, hi)
+        if solved is None:
+            st.warning(
+                f"No value of {label} between {lo:,.2f} and {hi:,.2f} reaches {seek_metric} = {seek_target:,.2f}. "
+                f"Closest achievable: {'N/A' if np.isnan(achieved) else f'{achieved:,.2f}'}."
+            )
+        else:
+            st.success(f"{label} = {solved:,.4f} gives {seek_metric} = {achieved:,.2f}.")
+
+    # ------------------------------------------------------
+    # SCENARIO SWEEP EXPORT (STREAMED TO DISK)
+    # ------------------------------------------------------
+    st.markdown("<div class='section-title'>Scenario Sweep Export</div>", unsafe_allow_html=True)
+
+    w1, w2, w3, w4 = st.columns(4)
+    with w1:
+        sweep_input = st.selectbox(
+            "Sweep Input",
+            list(GOAL_INPUTS),
+            format_func=lambda k: GOAL_INPUTS[k][0],
+            key="sweep_input"
+        )
+    with w2:
+        sweep_lo = st.number_input("From", value=float(GOAL_INPUTS[sweep_input][1][0]))
+    with w3:
+        sweep_hi = st.number_input("To", value=float(GOAL_INPUTS[sweep_input][1][1]))
+    with w4:
+        sweep_steps = st.number_input("Steps", min_value=2, max_value=10_000_000, value=1000, step=1000)
+
+    sweep_fmt = st.radio("Sweep Export Format", list(EXPORT_FORMATS), horizontal=True)
+
+    # Runs as a background job keyed by its inputs: the page stays responsive, an identical
+    # request reuses the running/finished job, and a new request cancels the previous one
+    job_manager = get_job_manager()
+    if "job_session" not in st.session_state:
+        st.session_state["job_session"] = JobSession(job_manager)
+    sweep_slot = st.session_state["job_session"].slot("sweep")
+
+    if st.button("Export Sweep"):
+        sweep_args = (projection_inputs, sweep_input, sweep_lo, sweep_hi, int(sweep_steps))
+        n_chunks = -(-int(sweep_steps) // DEFAULT_CHUNK_ROWS)
+        job_manager.submit(
+            sweep_slot, job_key("sweep", sorted(projection_inputs.items()), sweep_args[1:], sweep_fmt),
+            lambda job: (export_to_tempfile(
+                {"sweep": track(job, sweep_chunks(*sweep_args), n_chunks, "Sweep chunks")}, sweep_fmt
+            ), sweep_fmt)
+        )
+
+    sweep_job = job_manager.get(sweep_slot)
+    if sweep_job is not None:
+        if not sweep_job.done():
+            @st.fragment(run_every=1)
+            def sweep_progress():
+                st.progress(sweep_job.progress, text=sweep_job.message)
+                if sweep_job.done():
+                    st.rerun()
+
+            sweep_progress()
+        elif sweep_job.state == "failed":
+            st.error(f"Sweep export failed: {sweep_job.future.exception()}")
+        elif sweep_job.state == "done":
+            # The file is deleted once the job is superseded, evicted or its session ends
+            sweep_file, done_fmt = sweep_job.result()
+            _, suffix, mime = EXPORT_FORMATS[done_fmt]
+            with open(sweep_file.path, "rb") as fh:
+                st.download_button("Download Sweep", data=fh, file_name=f"scenario_sweep{suffix}", mime=mime)
+
+    # ------------------------------------------------------
+    # INVESTOR REPORTS (RENDERED ON A BACKGROUND WORKER)
+    # ------------------------------------------------------
+    st.markdown("<div class='section-title'>Investor Report</div>", unsafe_allow_html=True)
+
+    worker = get_report_worker()
+    r1, r2 = st.columns(2)
+    with r1:
+        report_name = st.text_input("Report Title", value=save_name.strip() or "Current Scenario")
+        if st.button("Generate Report (Current Inputs)"):
+            st.session_state["report_jobs"] = {
+                report_name: worker.submit(report_name, projection_inputs, store.path)
+            }
+    with r2:
+        batch_names = st.multiselect("Batch Reports for Saved Scenarios", store.names())
+        if st.button("Generate Batch Reports") and batch_names:
+            st.session_state["report_jobs"] = worker.submit_batch(
+                {name: store.load(name) for name in batch_names}, store.path
+            )
+
+    report_jobs = st.session_state.get("report_jobs")
+    if report_jobs:
+        done = {name: f for name, f in report_jobs.items() if f.done()}
+        if len(done) < len(report_jobs):
+            st.info(f"Rendering reports in the background: {len(done)}/{len(report_jobs)} ready.")
+            if st.button("Refresh Report Status"):
+                st.rerun()
+        else:
+            failed = [name for name, f in done.items() if f.exception() is not None]
+            if failed:
+                st.error(f"Report generation failed for: {', '.join(failed)}")
+            reports = {name: f.result() for name, f in done.items() if f.exception() is None}
+            if len(reports) == 1:
+                name, body = next(iter(reports.items()))
+                st.download_button("Download Report (HTML)", data=body, file_name=f"{name}.html", mime="text/html")
+            elif reports:
+                st.download_button(
+                    "Download Reports (zip)", data=zip_reports(reports),
+                    file_name="investor_reports.zip", mime="application/zip"
+                )
+
+    # ------------------------------------------------------
+    # CAP TABLE & EXIT WATERFALL
+    # ------------------------------------------------------
+    st.markdown("<div class='section-title'>Cap Table & Exit Waterfall</div>", unsafe_allow_html=True)
+
+    ct1, ct2 = st.columns([1, 3])
+    with ct1:
+        founder_shares = st.number_input(
+            "Founder Shares", min_value=1, value=DEFAULT_FOUNDER_SHARES, step=100_000
+        )
+    with ct2:
+        st.caption(
+            "Rounds in chronological order. Later rounds are senior. Non-participating preferred "
+            "takes the greater of its preference or converting to common."
+        )
+    rounds = st.data_editor(
+        DEFAULT_ROUNDS,
+        num_rows="dynamic",
+        width="stretch",
+        column_config={
+            "name": st.column_config.TextColumn("Round"),
+            "investment": st.column_config.NumberColumn("Investment (₹)", min_value=0.0, format="%.0f"),
+            "pre_money": st.column_config.NumberColumn("Pre-Money (₹)", min_value=0.0, format="%.0f"),
+            "pool_pct": st.column_config.NumberColumn("Option Pool % (post)", min_value=0.0, max_value=90.0),
+            "pref_multiple": st.column_config.NumberColumn("Liq. Pref (×)", min_value=0.0),
+            "participating": st.column_config.CheckboxColumn("Participating"),
+        },
+        key="cap_rounds"
+    ).dropna(subset=["name", "investment", "pre_money"]).fillna(
+        {"pool_pct": 0.0, "pref_multiple": 1.0, "participating": False}
+    )
+
+    try:
+        cap = build_cap_table(rounds, founder_shares) if len(rounds) else None
+    except ValueError as e:
+        st.error(str(e))
+        cap = None
+
+    # Payouts need the projected terminal value; they are filled in after "Run Investor Projection"
+    cap_results = st.container()
 
     # ------------------------------------------------------
     # RUN PROJECTION
     # ------------------------------------------------------
     if st.button("Run Investor Projection"):
 
-        years_arr = np.arange(1, years + 1)
-        rev_list = []
-        ebit_list = []
-        margin_list = []
-        fcf_list = []
-
-        cur_rev = base_rev
-        cur_margin = ebitda_start_pct / 100
-
-        for _ in years_arr:
-            rev_list.append(cur_rev)
-            ebit = cur_rev * cur_margin
-            ebit_list.append(ebit)
-            margin_list.append(cur_margin * 100)
-            fcf_list.append(ebit - cur_rev * (reinvest_pct / 100))
-            cur_rev *= (1 + growth_pct/100)
-            cur_margin *= (1 + ebitda_growth_pct/100)
-
-        proj = pd.DataFrame({
-            "Year": years_arr,
-            "Revenue (₹)": rev_list,
-            "EBITDA (₹)": ebit_list,
-            "EBITDA %": margin_list,
-            "FCF (₹)": fcf_list
-        })
-
-        proj["Valuation (₹)"] = proj["EBITDA (₹)"] * multiple
-        terminal_value = proj["Valuation (₹)"].iloc[-1]
-        investor_payout = terminal_value * (equity_pct/100)
-
-        # IRR calculation
-        cash_flows = [-invest] + [0]*(years-1) + [investor_payout]
-        try:
-            irr = nf.irr(cash_flows)
-        except:
-            irr = np.nan
-
-        roi = (investor_payout - invest) / invest
-
-        # DCF
-        dcf_val = 0
-        for idx, row in proj.iterrows():
-            dcf_val += row["FCF (₹)"] / ((1 + discount_rate_pct/100)**row["Year"])
-        dcf_val += terminal_value / ((1 + discount_rate_pct/100)**years)
+        # Served from the input-hash cache when this exact scenario was computed before
+        proj, outcome = store.results(projection_inputs)
+        st.session_state["investor_projection"] = (dict(projection_inputs), outcome)
+
+        terminal_value = outcome["terminal_value"]
+        investor_payout = outcome["payout"]
+        irr = outcome["irr"]
+        roi = outcome["roi"]
+        dcf_val = outcome["dcf_value"]
 
         # TABLE
         st.markdown("<div class='section-title'>Projection Table</div>", unsafe_allow_html=True)
@@ -293,7 +553,7 @@ with tab3:
         )
 
         # CHART
-        fig = combo_chart_plotly(proj, "Year", "Revenue (₹)", "EBITDA %", "Revenue + EBITDA% Projection")
+        fig = cached_figure(combo_chart_plotly, proj, "Year", "Revenue (₹)", "EBITDA %", "Revenue + EBITDA% Projection")
         st.plotly_chart(fig, use_container_width=True)
 
         # KPI BLOCK
@@ -301,7 +561,7 @@ with tab3:
         k1, k2, k3, k4 = st.columns(4)
         k1.markdown(f"<div class='kpi'>Terminal Value<br/>₹{terminal_value:,.0f}</div>", unsafe_allow_html=True)
         k2.markdown(f"<div class='kpi'>Investor Payout<br/>₹{investor_payout:,.0f}</div>", unsafe_allow_html=True)
-        k3.markdown(f"<div class='kpi'>ROI<br/>{roi*100:.2f}%</div>", unsafe_allow_html=True)
+        k3.markdown(f"<div class='kpi'>ROI<br/>{'N/A' if np.isnan(roi) else f'{roi*100:.2f}%'}</div>", unsafe_allow_html=True)
         k4.markdown(f"<div class='kpi'>IRR<br/>{'N/A' if np.isnan(irr) else f'{irr*100:.2f}%'} </div>", unsafe_allow_html=True)
 
         st.markdown(f"<div class='kpi'>DCF Valuation<br/>₹{dcf_val:,.0f}</div>", unsafe_allow_html=True)
@@ -309,13 +569,73 @@ with tab3:
         # INSIGHTS
         st.markdown("<div class='section-title'>Automated Insights</div>", unsafe_allow_html=True)
 
-        insights = []
-        if growth_pct >= 25:
-            insights.append("Revenue growth rate indicates strong expansion potential.")
-        if ebitda_start_pct >= 20:
-            insights.append("EBITDA margin is healthy for an early-stage EdTech/Analytics company.")
-        if roi >= 1:
-            insights.append("Investment has a realistic chance of doubling the capital.")
+        insights = investor_insights(projection_inputs, outcome)
 
         for i, text in enumerate(insights, start=1):
             st.markdown(f"<div class='card'><b>Insight {i}.</b> {text}</div>", unsafe_allow_html=True)
+
+    # ------------------------------------------------------
+    # CAP TABLE PAYOUTS (RENDERED INTO THE CAP TABLE SECTION ABOVE)
+    # ------------------------------------------------------
+    # Valued at the terminal value of the last projection run for the current inputs,
+    # so the scenario store is only consulted when a projection is run
+    last_projection = st.session_state.get("investor_projection")
+    if cap is not None:
+        with cap_results:
+            if last_projection is not None and last_projection[0] == projection_inputs:
+                exit_value = last_projection[1]["terminal_value"]
+                at_exit = waterfall(cap, [exit_value])
+                moic = holder_returns(cap, at_exit)
+
+                cap_view = cap[["holder", "class", "shares", "ownership_pct", "invested", "preference"]].copy()
+                cap_view["Payout at Terminal Value (₹)"] = at_exit.iloc[0].to_numpy()
+                cap_view["MOIC (×)"] = moic.iloc[0].to_numpy()
+                st.dataframe(
+                    cap_view.rename(columns={
+                        "holder": "Holder", "class": "Class", "shares": "Shares", "ownership_pct": "Ownership %",
+                        "invested": "Invested (₹)", "preference": "Liq. Preference (₹)"
+                    }).style.format({
+                        "Shares": "{:,.0f}", "Ownership %": "{:.2f}", "Invested (₹)": "{:,.0f}",
+                        "Liq. Preference (₹)": "{:,.0f}", "Payout at Terminal Value (₹)": "{:,.0f}", "MOIC (×)": "{:.2f}"
+                    }, na_rep="—"),
+                    width="stretch"
+                )
+
+                preferred_names = cap.loc[cap["class"] == "preferred", "holder"].tolist()
+                your_round = st.selectbox("Your Round", preferred_names, index=len(preferred_names) - 1)
+                simple_payout = exit_value * equity_pct / 100
+                st.markdown(
+                    f"<div class='card'>At a terminal value of ₹{exit_value:,.0f}, <b>{your_round}</b> receives "
+                    f"₹{at_exit[your_round].iloc[0]:,.0f} through the waterfall, versus ₹{simple_payout:,.0f} from the "
+                    f"flat {equity_pct:.2f}% equity-stake model.</div>",
+                    unsafe_allow_html=True
+                )
+
+                # Payout per holder across exit values (one vectorized waterfall call)
+                exit_grid = np.linspace(0, max(exit_value, 1.0) * 2, 400)
+                curve = waterfall(cap, exit_grid)
+                fig_wf = go.Figure()
+                for holder in curve.columns:
+                    fig_wf.add_trace(go.Scatter(
+                        x=exit_grid, y=curve[holder], name=holder, mode="lines", stackgroup="payout",
+                        hovertemplate=f"{holder}<br>Exit ₹%{{x:,.0f}}<br>Payout ₹%{{y:,.0f}}<extra></extra>"
+                    ))
+                fig_wf.add_vline(x=exit_value, line_dash="dash", line_color="#064b86")
+                fig_wf.update_layout(
+                    title="Exit Waterfall: Payout by Holder",
+                    xaxis_title="Exit Value (₹)", yaxis_title="Payout (₹)",
+                    template=PLOT_TEMPLATE, hovermode="x unified"
+                )
+                st.plotly_chart(fig_wf, width="stretch")
+            else:
+                st.dataframe(
+                    cap[["holder", "class", "shares", "ownership_pct", "invested", "preference"]].rename(columns={
+                        "holder": "Holder", "class": "Class", "shares": "Shares", "ownership_pct": "Ownership %",
+                        "invested": "Invested (₹)", "preference": "Liq. Preference (₹)"
+                    }).style.format({
+                        "Shares": "{:,.0f}", "Ownership %": "{:.2f}", "Invested (₹)": "{:,.0f}",
+                        "Liq. Preference (₹)": "{:,.0f}"
+                    }),
+                    width="stretch"
+                )
+                st.info("Run Investor Projection to see each holder's payout at the projected terminal value.")
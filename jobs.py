@@ -0,0 +1,164 @@
+import hashlib
+import os
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================================================
+# BACKGROUND JOBS (KEYED BY INPUT HASH, PROGRESS, SUPERSEDING)
+# =========================================================
+# Heavy steps run on a shared pool instead of the Streamlit script thread.
+# A job is identified by the hash of its inputs, so reruns with unchanged
+# inputs pick up the same job (running or finished) instead of starting a new
+# one. Each caller owns named slots (e.g. "<session>:ingest"); submitting a new
+# key into a slot drops the job it replaces (cancelling it if still running)
+# unless another slot still wants it, and a session's slots are released when
+# the session goes away, so results that own files are freed with them.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_MAX_RESULTS = 64
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def job_key(*parts):
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+class Job:
+
+    def __init__(self, key):
+        self.key = key
+        self.progress = 0.0
+        self.message = "Queued"
+        self.future = None
+        self._cancel = threading.Event()
+
+    def report(self, progress, message=None):
+        # Called by the job function; doubles as the cancellation checkpoint
+        if self._cancel.is_set():
+            raise JobCancelled(self.key)
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+    @property
+    def state(self):
+        if self.cancelled:
+            return "cancelled"
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        return "failed" if self.future.exception() is not None else "done"
+
+
+def track(job, chunks, total, label="chunks"):
+    # Wraps an iterable of chunks so each one reports progress and checks for cancellation
+    for i, chunk in enumerate(chunks):
+        job.report(i / max(total, 1), f"{label}: {i:,} of {total:,}")
+        yield chunk
+    job.report(1.0, f"{label}: {total:,} of {total:,}")
+
+
+class JobManager:
+
+    def __init__(self, max_workers=JOB_WORKERS, max_results=JOB_MAX_RESULTS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.max_results = max_results
+        self._jobs = OrderedDict()      # key → Job (finished ones kept in LRU order)
+        self._slots = {}                # slot → key
+        self._lock = threading.Lock()
+
+    def submit(self, slot, key, fn, *args, **kwargs):
+        # fn(job, *args, **kwargs) runs on the pool; returns the Job for this key
+        with self._lock:
+            previous = self._slots.get(slot)
+            self._slots[slot] = key
+            if previous is not None and previous != key:
+                self._drop_unwanted(previous)
+
+            job = self._jobs.get(key)
+            if job is not None and not job.cancelled and job.state != "failed":
+                self._jobs.move_to_end(key)
+                return job
+
+            job = Job(key)
+            job.future = self._pool.submit(self._run, job, fn, args, kwargs)
+            self._jobs[key] = job
+            self._evict()
+            return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.report(0.0, "Running")
+        result = fn(job, *args, **kwargs)
+        job.report(1.0, "Done")
+        return result
+
+    def release_prefix(self, prefix):
+        # Frees every slot starting with prefix (one session's slots)
+        with self._lock:
+            for slot in [s for s in self._slots if s.startswith(prefix)]:
+                self._drop_unwanted(self._slots.pop(slot))
+
+    def _drop_unwanted(self, key):
+        # Caller holds the lock; a job no slot points at is cancelled (if running) and forgotten
+        job = self._jobs.get(key)
+        if job is None or key in self._slots.values():
+            return
+        if not job.done():
+            job.cancel()
+        del self._jobs[key]
+
+    def get(self, slot):
+        with self._lock:
+            key = self._slots.get(slot)
+            return self._jobs.get(key) if key is not None else None
+
+    def _evict(self):
+        # Only finished jobs that no slot points at are dropped
+        wanted = set(self._slots.values())
+        for key in list(self._jobs):
+            if len(self._jobs) <= self.max_results:
+                break
+            if key not in wanted and self._jobs[key].done():
+                del self._jobs[key]
+
+
+class JobSession:
+    # One per Streamlit session (kept in session_state): names the session's slots,
+    # and releases them when the session state is dropped
+
+    def __init__(self, manager):
+        self.id = uuid.uuid4().hex
+        self._finalizer = weakref.finalize(self, manager.release_prefix, f"{self.id}:")
+
+    def slot(self, name):
+        return f"{self.id}:{name}"
+
+
+_MANAGER = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_job_manager():
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = JobManager()
+        return _MANAGER
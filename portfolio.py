@@ -0,0 +1,210 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analytics import month_rollup, fiscal_rollups
+from finance import MODE_A, PROJECTION_INPUTS, metric_block, project
+from shared_cache import private_cache_dir
+from validation import read_ledger_csv, validate_ledger
+
+# =========================================================
+# MULTI-COMPANY PORTFOLIO (PARALLEL LEDGERS, VECTORIZED PROJECTIONS)
+# =========================================================
+# A portfolio is a directory of <company>.csv ledgers plus an optional
+# portfolio_inputs.csv with one row per company (column "company" = file stem,
+# any PROJECTION_INPUTS and optional op_cost_pct / opex_pct / reinvest_pct).
+# Ledgers are reduced to a small (year, month) rollup in worker processes and
+# cached on disk by file identity, so a refresh only re-reads changed files.
+# Projections for every company are then evaluated together in the parent.
+# The cache is a per-user 0700 directory of Parquet files (data only, never
+# executable formats such as pickle).
+PORTFOLIO_INPUTS_FILE = "portfolio_inputs.csv"
+PORTFOLIO_CACHE_DIR = os.environ.get(
+    "PORTFOLIO_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                 "edtech_portfolio")
+)
+SUMMARY_META_KEY = b"edtech_summary"
+PORTFOLIO_WORKERS = int(os.environ.get("PORTFOLIO_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+# Used where a company's inputs row leaves a field blank; base_rev and growth_pct
+# default to the ledger's trailing-12-month revenue and CAGR.
+PORTFOLIO_DEFAULTS = dict(
+    ebitda_growth_pct=4.0,
+    years=5,
+    invest=1000000.0,
+    equity_pct=20.0,
+    multiple=6.0,
+    discount_rate_pct=12.0,
+    **MODE_A
+)
+
+
+def ledger_files(directory):
+    return {
+        os.path.splitext(os.path.basename(path))[0]: path
+        for path in sorted(glob.glob(os.path.join(directory, "*.csv")))
+        if os.path.basename(path) != PORTFOLIO_INPUTS_FILE
+    }
+
+
+def read_company_inputs(directory):
+    path = os.path.join(directory, PORTFOLIO_INPUTS_FILE)
+    if not os.path.exists(path):
+        return {}
+    table = pd.read_csv(path)
+    table.columns = table.columns.str.strip().str.lower()
+    table["company"] = table["company"].astype(str).str.strip()
+    return {row.pop("company"): {k: v for k, v in row.items() if pd.notna(v)}
+            for row in table.to_dict("records")}
+
+
+def _file_key(path):
+    # Identity of the file on disk; a changed file gets a new key
+    st = os.stat(path)
+    return hashlib.sha256(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8")).hexdigest()
+
+
+def cached_summary(path, cache_dir=PORTFOLIO_CACHE_DIR):
+    import pyarrow.parquet as pq
+
+    cache_path = os.path.join(private_cache_dir(cache_dir), f"{_file_key(path)}.parquet")
+    if not os.path.exists(cache_path):
+        return None
+    table = pq.read_table(cache_path)
+    summary = json.loads(table.schema.metadata[SUMMARY_META_KEY])
+    summary["rollup"] = table.replace_schema_metadata(None).to_pandas()
+    return summary
+
+
+def summarize_ledger(path, cache_dir=PORTFOLIO_CACHE_DIR):
+    # Runs in a worker process: ledger → (year, month) revenue rollup + row counts
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    cache_dir = private_cache_dir(cache_dir)
+    cache_path = os.path.join(cache_dir, f"{_file_key(path)}.parquet")
+    with open(path, "rb") as fh:
+        raw = read_ledger_csv(fh.read())
+    if "first_payment_date" not in raw.columns or "collected_amount" not in raw.columns:
+        raise ValueError("ledger needs first_payment_date and collected_amount columns")
+    parsed, report = validate_ledger(raw, sample_size=0)
+    dates = parsed["first_payment_date"]
+    ok = dates.notna().to_numpy()
+    base = month_rollup(pd.DataFrame({
+        "year": dates[ok].dt.year.to_numpy(),
+        "month": dates[ok].dt.month.to_numpy(),
+        "collected_amount": parsed["collected_amount"][ok].fillna(0).to_numpy(),
+    }))
+    counts = {"rows": int(report["rows_in"]), "rows_flagged": int(report["rows_with_issues"])}
+
+    # Row counts ride along as schema metadata, so one file holds the whole summary
+    table = pa.Table.from_pandas(base, preserve_index=False)
+    table = table.replace_schema_metadata({SUMMARY_META_KEY: json.dumps(counts).encode("utf-8")})
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".parquet")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp)
+        os.replace(tmp, cache_path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return {"rollup": base, **counts}
+
+
+def ledger_kpis(base, fy_start=1):
+    # TTM revenue and CAGR from the rollup (same CAGR rule as the main dashboard)
+    _, _, yearly = fiscal_rollups(base, fy_start)
+    months = (base["year"] * 12 + base["month"]).to_numpy()
+    revenue = base["collected_amount"].to_numpy(dtype=float)
+    ttm = float(revenue[months > months.max() - 12].sum()) if len(months) else 0.0
+    cagr = 0.0
+    if len(yearly) > 1:
+        beginning, ending = yearly["Revenue (₹)"].iloc[0], yearly["Revenue (₹)"].iloc[-1]
+        if beginning > 0:
+            cagr = (ending / beginning) ** (1 / (len(yearly) - 1)) - 1
+    return {"total_revenue": float(revenue.sum()), "ttm_revenue": ttm, "cagr": cagr, "years_of_data": len(yearly)}
+
+
+def fund_irr(invest, payout, years, lo=-0.99, hi=10.0, iters=100):
+    # Rate r with Σ payout_i / (1 + r)^years_i = Σ invest_i (all capital deployed at t = 0)
+    invest, payout, years = (np.asarray(a, dtype=float) for a in (invest, payout, years))
+    total = invest.sum()
+    if total <= 0 or payout.sum() <= 0:
+        return np.nan
+    npv = lambda r: (payout / (1 + r) ** years).sum() - total
+    if npv(lo) * npv(hi) > 0:
+        return np.nan
+    for _ in range(iters):
+        mid = (lo + hi) / 2
+        if npv(lo) * npv(mid) <= 0:
+            hi = mid
+        else:
+            lo = mid
+    return (lo + hi) / 2
+
+
+def run_portfolio(directory, fy_start=1, workers=PORTFOLIO_WORKERS, cache_dir=PORTFOLIO_CACHE_DIR):
+    # → (per-company DataFrame, fund summary dict, {company: error message})
+    files = ledger_files(directory)
+    overrides = read_company_inputs(directory)
+
+    summaries, errors = {}, {}
+    for name, path in files.items():
+        summary = cached_summary(path, cache_dir)
+        if summary is not None:
+            summaries[name] = summary
+    stale = {name: path for name, path in files.items() if name not in summaries}
+    if stale:
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(stale)))) as pool:
+            futures = {name: pool.submit(summarize_ledger, path, cache_dir) for name, path in stale.items()}
+            for name, future in futures.items():
+                try:
+                    summaries[name] = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+
+    rows = []
+    for name, summary in sorted(summaries.items()):
+        kpis = ledger_kpis(summary["rollup"], fy_start)
+        inputs = dict(PORTFOLIO_DEFAULTS, base_rev=kpis["ttm_revenue"], growth_pct=kpis["cagr"] * 100)
+        inputs.update(overrides.get(name, {}))
+        inputs.setdefault("ebitda_start_pct", 100 - inputs["op_cost_pct"] - inputs["opex_pct"])
+        block = metric_block(kpis["total_revenue"], inputs["op_cost_pct"], inputs["opex_pct"], inputs["reinvest_pct"])
+        rows.append({
+            "company": name, "rows": summary["rows"], "rows_flagged": summary["rows_flagged"], **kpis,
+            "ebitda": float(block["ebitda"]), "fcf": float(block["fcf"]),
+            **{k: float(inputs[k]) for k in PROJECTION_INPUTS},
+        })
+
+    companies = pd.DataFrame(rows)
+    if companies.empty:
+        return companies, {}, errors
+
+    # One vectorized projection call per distinct horizon
+    companies["years"] = companies["years"].astype(int)
+    for key in ["terminal_value", "payout", "roi", "irr", "payout_multiple", "dcf_value"]:
+        companies[key] = np.nan
+    for years, idx in companies.groupby("years").groups.items():
+        res = project(**{k: (years if k == "years" else companies.loc[idx, k].to_numpy()) for k in PROJECTION_INPUTS})
+        for key in ["terminal_value", "payout", "roi", "irr", "payout_multiple", "dcf_value"]:
+            companies.loc[idx, key] = res[key]
+
+    invested = companies["invest"].sum()
+    paid = companies["payout"].sum()
+    fund = {
+        "companies": len(companies),
+        "invested": float(invested),
+        "payout": float(paid),
+        "moic": float(paid / invested) if invested > 0 else np.nan,
+        "irr": float(fund_irr(companies["invest"], companies["payout"], companies["years"])),
+        "dcf_value": float(companies["dcf_value"].sum()),
+        "total_revenue": float(companies["total_revenue"].sum()),
+    }
+    return companies, fund, errors
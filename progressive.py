@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+
+# =========================================================
+# PROGRESSIVE LOADING (INSTANT SAMPLE PREVIEW + EXACT BUILD)
+# =========================================================
+# Uploads above the threshold are previewed from a sample of lines taken at
+# evenly spread random byte offsets, which costs the same no matter how large
+# the file is. The exact parse + preprocessing runs as a background job and
+# replaces the estimate on a later rerun.
+PREVIEW_THRESHOLD_MB = float(os.environ.get("PREVIEW_THRESHOLD_MB", "50"))
+PREVIEW_ROWS = 100_000
+PREVIEW_BLOCKS = 200
+
+
+def needs_preview(data, threshold_mb=PREVIEW_THRESHOLD_MB):
+    return len(data) > threshold_mb * 1024 * 1024
+
+
+def _line_start(data, pos):
+    # First line boundary at or after pos
+    if pos <= 0 or data[pos - 1:pos] == b"\n":
+        return pos
+    nl = data.find(b"\n", pos)
+    return len(data) if nl < 0 else nl + 1
+
+
+def _line_end(data, pos):
+    nl = data.find(b"\n", pos)
+    return len(data) if nl < 0 else nl + 1
+
+
+def sample_csv_bytes(data, rows=PREVIEW_ROWS, blocks=PREVIEW_BLOCKS, seed=0):
+    # Returns (header + sampled lines as CSV bytes, estimated data rows in the file).
+    # Each block is a run of consecutive lines starting at a random offset; blocks
+    # never overlap, so no row is sampled twice.
+    header_end = _line_end(data, 0)
+    body = data[header_end:header_end + 65536]
+    avg_line = len(body) / max(body.count(b"\n"), 1)
+    block_bytes = max(int(rows / blocks * avg_line), 1)
+
+    rng = np.random.default_rng(seed)
+    starts = np.sort(rng.integers(header_end, max(len(data), header_end + 1), blocks))
+    parts = [data[:header_end]]
+    lines = sampled = 0
+    prev_end = header_end
+    for s in starts:
+        start = _line_start(data, max(int(s), prev_end))
+        if start >= len(data):
+            break
+        end = _line_end(data, min(start + block_bytes, len(data) - 1))
+        chunk = data[start:end]
+        if not chunk.endswith(b"\n"):
+            chunk += b"\n"
+        parts.append(chunk)
+        lines += chunk.count(b"\n")
+        sampled += end - start
+        prev_end = end
+
+    est_rows = (len(data) - header_end) / (sampled / lines) if lines else 0
+    return b"".join(parts), int(round(est_rows))
+
+
+def head_csv_bytes(data, rows=PREVIEW_ROWS):
+    # Fallback for files the block sampler cannot split (e.g. quoted newlines)
+    end = 0
+    for _ in range(rows + 1):
+        end = _line_end(data, end)
+        if end >= len(data):
+            break
+    return data[:end]
+
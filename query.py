@@ -0,0 +1,265 @@
+import functools
+import hashlib
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import fiscal_keys
+from shared_cache import private_cache_dir
+
+# =========================================================
+# PLUGGABLE QUERY BACKEND (PANDAS / DUCKDB / POLARS)
+# =========================================================
+# The period filter (Step 2) and the (year, month) revenue rollup (Step 3) can
+# run on pandas, DuckDB or Polars. pandas works on the cached frame directly.
+# DuckDB and Polars scan a Parquet copy of the query columns, written once per
+# dataset key: rows are sorted by calendar period in row groups, so the period
+# predicate derived from the fiscal year / month range skips whole row groups,
+# and only the few columns a query needs are read. Every query bumps its file's
+# mtime; pruning only removes files idle past a grace period, and a file removed
+# anyway (another process, manual cleanup) is written again from the cached frame.
+#
+# Every backend returns the same things: the filter is a boolean row mask over
+# the cached frame (applied in pandas, so rows and dtypes never differ) and the
+# rollup is year / month int64 + collected_amount float64 sorted by period.
+# DuckDB and Polars are optional; install them to select those backends.
+QUERY_BACKENDS = ["pandas", "duckdb", "polars"]
+QUERY_BACKEND = os.environ.get("QUERY_BACKEND", "pandas").strip().lower()
+QUERY_CACHE_DIR = os.environ.get(
+    "QUERY_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                 "edtech_query")
+)
+QUERY_CACHE_FILES = int(os.environ.get("QUERY_CACHE_FILES", "32"))
+QUERY_CACHE_GRACE_S = float(os.environ.get("QUERY_CACHE_GRACE_S", "3600"))
+QUERY_ROW_GROUP_ROWS = 128 * 1024
+
+
+def _rollup_frame(year, month, revenue):
+    return pd.DataFrame({
+        "year": np.asarray(year, dtype=np.int64),
+        "month": np.asarray(month, dtype=np.int64),
+        "collected_amount": np.nan_to_num(np.asarray(revenue, dtype=float)),
+    })
+
+
+def fiscal_period_mask(df, fy_start, year_range, month_range, quarter_range):
+    # Row mask for a frame with year / month columns (the ledger or a rollup of it)
+    fiscal_year, fiscal_quarter, fiscal_month = fiscal_keys(df["year"], df["month"], fy_start)
+    return (
+        (fiscal_year >= year_range[0]) & (fiscal_year <= year_range[1])
+        & (fiscal_month >= month_range[0]) & (fiscal_month <= month_range[1])
+        & (fiscal_quarter >= quarter_range[0]) & (fiscal_quarter <= quarter_range[1])
+    )
+
+
+def period_bounds(fy_start, year_range, month_range):
+    # Calendar period range (year × 12 + month − 1) covering the selected fiscal
+    # months; a range predicate on the sorted period column prunes row groups
+    first_year = int(year_range[0]) - (fy_start > 1)
+    lo = first_year * 12 + fy_start - 1 + int(month_range[0]) - 1
+    hi = (first_year + int(year_range[1]) - int(year_range[0])) * 12 + fy_start - 1 + int(month_range[1]) - 1
+    return lo, hi
+
+
+class ParquetLedger:
+    # The query columns of one dataset on disk: row (position in the cached frame),
+    # period, year, month, collected_amount; sorted by (period, row)
+
+    def __init__(self, path, rows, rebuild):
+        self.path = path
+        self.rows = rows
+        self._rebuild = rebuild
+
+    def open(self):
+        # Called before every scan: marks the file as in use, or rewrites it if it was pruned
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            self._rebuild()
+        return self.path
+
+
+def _prune(cache_dir, keep, max_files, grace_s):
+    # Least recently used files beyond the limit are dropped, but never one used
+    # within grace_s (a query may still be reading it)
+    files = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".parquet"):
+            try:
+                files.append((os.path.getmtime(os.path.join(cache_dir, name)), os.path.join(cache_dir, name)))
+            except FileNotFoundError:
+                pass
+    excess = len(files) - max_files
+    cutoff = time.time() - grace_s
+    for mtime, stale in sorted(files):
+        if excess <= 0 or mtime > cutoff:
+            break
+        if stale != keep:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+            excess -= 1
+
+
+def write_query_parquet(df, dataset_key, cache_dir=QUERY_CACHE_DIR, max_files=QUERY_CACHE_FILES,
+                        grace_s=QUERY_CACHE_GRACE_S):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    cache_dir = private_cache_dir(cache_dir)
+    path = os.path.join(cache_dir, hashlib.sha256(str(dataset_key).encode("utf-8")).hexdigest() + ".parquet")
+    rebuild = functools.partial(write_query_parquet, df, dataset_key, cache_dir, max_files, grace_s)
+    try:
+        os.utime(path)
+        return ParquetLedger(path, pq.ParquetFile(path).metadata.num_rows, rebuild)
+    except FileNotFoundError:
+        pass
+
+    year = df["year"].to_numpy(dtype=np.int64)
+    month = df["month"].to_numpy(dtype=np.int64)
+    period = year * 12 + month - 1
+    order = np.argsort(period, kind="stable")
+    table = pa.table({
+        "row": order.astype(np.int64),
+        "period": period[order],
+        "year": year[order],
+        "month": month[order],
+        # NaN is stored as null, which every engine's SUM skips (as pandas does)
+        "collected_amount": pa.array(df["collected_amount"].to_numpy(dtype=float)[order], from_pandas=True),
+    })
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".parquet")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp, row_group_size=QUERY_ROW_GROUP_ROWS)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+    _prune(cache_dir, path, max_files, grace_s)
+    return ParquetLedger(path, len(df), rebuild)
+
+
+def _mask_from_rows(rows, n):
+    mask = np.zeros(n, dtype=bool)
+    mask[np.asarray(rows, dtype=np.int64)] = True
+    return mask
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, cache_dir=QUERY_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def prepare(self, df, dataset_key):
+        return df
+
+    def period_mask(self, source, fy_start, year_range, month_range, quarter_range):
+        return fiscal_period_mask(source, fy_start, year_range, month_range, quarter_range)
+
+    def month_rollup(self, source):
+        out = source.groupby(["year", "month"], sort=True)["collected_amount"].sum().reset_index()
+        return _rollup_frame(out["year"], out["month"], out["collected_amount"])
+
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, cache_dir=QUERY_CACHE_DIR):
+        import duckdb
+        self._duckdb = duckdb
+        self.cache_dir = cache_dir
+
+    def prepare(self, df, dataset_key):
+        return write_query_parquet(df, dataset_key, self.cache_dir)
+
+    def _query(self, sql, params):
+        # One short-lived connection per query, so concurrent sessions never share a cursor
+        con = self._duckdb.connect()
+        try:
+            return con.execute(sql, params).fetchnumpy()
+        finally:
+            con.close()
+
+    def period_mask(self, source, fy_start, year_range, month_range, quarter_range):
+        fy_start = int(fy_start)
+        lo, hi = period_bounds(fy_start, year_range, month_range)
+        # Same integer arithmetic as analytics.fiscal_keys
+        fiscal_month = f"((month - {fy_start} + 12) % 12 + 1)"
+        fiscal_quarter = f"(({fiscal_month} - 1) // 3 + 1)"
+        sql = (
+            "SELECT row FROM read_parquet(?) WHERE period BETWEEN ? AND ?"
+            f" AND {fiscal_month} BETWEEN ? AND ? AND {fiscal_quarter} BETWEEN ? AND ?"
+        )
+        out = self._query(sql, [source.open(), lo, hi, int(month_range[0]), int(month_range[1]),
+                                int(quarter_range[0]), int(quarter_range[1])])
+        return _mask_from_rows(out["row"], source.rows)
+
+    def month_rollup(self, source):
+        sql = (
+            "SELECT year, month, COALESCE(SUM(collected_amount), 0) AS collected_amount"
+            " FROM read_parquet(?) GROUP BY year, month ORDER BY year, month"
+        )
+        out = self._query(sql, [source.open()])
+        return _rollup_frame(out["year"], out["month"], out["collected_amount"])
+
+
+class PolarsBackend:
+    name = "polars"
+
+    def __init__(self, cache_dir=QUERY_CACHE_DIR):
+        import polars
+        self._pl = polars
+        self.cache_dir = cache_dir
+
+    def prepare(self, df, dataset_key):
+        return write_query_parquet(df, dataset_key, self.cache_dir)
+
+    def period_mask(self, source, fy_start, year_range, month_range, quarter_range):
+        pl = self._pl
+        lo, hi = period_bounds(int(fy_start), year_range, month_range)
+        fiscal_month = (pl.col("month") - fy_start + 12) % 12 + 1
+        fiscal_quarter = (fiscal_month - 1) // 3 + 1
+        rows = (
+            pl.scan_parquet(source.open())
+            .filter(
+                pl.col("period").is_between(lo, hi)
+                & fiscal_month.is_between(month_range[0], month_range[1])
+                & fiscal_quarter.is_between(quarter_range[0], quarter_range[1])
+            )
+            .select("row")
+            .collect()
+        )
+        return _mask_from_rows(rows["row"].to_numpy(), source.rows)
+
+    def month_rollup(self, source):
+        pl = self._pl
+        out = (
+            pl.scan_parquet(source.open())
+            .group_by(["year", "month"])
+            .agg(pl.col("collected_amount").fill_nan(None).sum())
+            .sort(["year", "month"])
+            .collect()
+        )
+        return _rollup_frame(out["year"].to_numpy(), out["month"].to_numpy(), out["collected_amount"].to_numpy())
+
+
+_BACKEND_CLASSES = {
+    "pandas": PandasBackend,
+    "duckdb": DuckDBBackend,
+    "polars": PolarsBackend,
+}
+
+
+def get_query_backend(name=None, cache_dir=QUERY_CACHE_DIR):
+    # Unknown names raise ValueError; a backend whose package is missing raises ImportError
+    name = (name or QUERY_BACKEND).strip().lower()
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown query backend '{name}'. Choose one of: {', '.join(QUERY_BACKENDS)}.")
+    return _BACKEND_CLASSES[name](cache_dir)
@@ -0,0 +1,178 @@
+import html
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from scenarios import ScenarioStore, input_hash, normalize_inputs
+
+# =========================================================
+# SELF-CONTAINED INVESTOR REPORT (HTML + INLINE SVG)
+# =========================================================
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", "4"))
+
+REPORT_CSS = """
+body { font-family: 'Inter', sans-serif; color:#000; margin:32px; }
+h1 { color:#064b86; margin-bottom:4px; }
+h2 { font-size:20px; margin-top:28px; border-bottom:2px solid #064b86; padding-bottom:4px; }
+.kpis { display:flex; flex-wrap:wrap; gap:12px; }
+.kpi { flex:1 1 160px; border:1px solid #e2e2e2; border-radius:12px; padding:14px;
+       text-align:center; color:#064b86; font-weight:600; }
+.card { border:1px solid #e5e5e5; border-radius:12px; padding:14px; margin-bottom:10px; }
+table { border-collapse:collapse; width:100%; font-size:14px; }
+th, td { border:1px solid #e5e5e5; padding:6px 10px; text-align:right; }
+th { background:#f4f7fb; }
+"""
+
+
+def investor_insights(inputs, outcome):
+    # Same rules as the Automated Insights cards in investor.py
+    insights = []
+    if inputs["growth_pct"] >= 25:
+        insights.append("Revenue growth rate indicates strong expansion potential.")
+    if inputs["ebitda_start_pct"] >= 20:
+        insights.append("EBITDA margin is healthy for an early-stage EdTech/Analytics company.")
+    if outcome["roi"] >= 1:
+        insights.append("Investment has a realistic chance of doubling the capital.")
+    return insights
+
+
+def projection_svg(proj, width=760, height=320):
+    # Revenue bars (green/red by EBITDA % sign) + EBITDA % line, as plain SVG
+    pad_l, pad_r, pad_t, pad_b = 70, 50, 20, 40
+    plot_w, plot_h = width - pad_l - pad_r, height - pad_t - pad_b
+    rev = proj["Revenue (₹)"].to_numpy(dtype=float)
+    pct = proj["EBITDA %"].to_numpy(dtype=float)
+    n = len(rev)
+    if n == 0:
+        return "<svg xmlns='http://www.w3.org/2000/svg'/>"
+
+    rev_max = max(rev.max(), 1.0)
+    pct_lo, pct_hi = min(pct.min(), 0.0), max(pct.max(), 1.0)
+    slot = plot_w / n
+    bar_w = slot * 0.6
+
+    parts = [f"<svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}' "
+             f"viewBox='0 0 {width} {height}' font-family='sans-serif' font-size='11'>"]
+    parts.append(f"<line x1='{pad_l}' y1='{pad_t + plot_h}' x2='{pad_l + plot_w}' y2='{pad_t + plot_h}' stroke='#999'/>")
+    parts.append(f"<text x='{pad_l - 8}' y='{pad_t + 10}' text-anchor='end'>₹{rev_max:,.0f}</text>")
+
+    points = []
+    for i in range(n):
+        x = pad_l + slot * i + (slot - bar_w) / 2
+        h = rev[i] / rev_max * plot_h
+        color = "#2ecc71" if pct[i] >= 0 else "#e74c3c"
+        parts.append(f"<rect x='{x:.1f}' y='{pad_t + plot_h - h:.1f}' width='{bar_w:.1f}' height='{h:.1f}' fill='{color}'>"
+                     f"<title>Year {proj['Year'].iloc[i]}: ₹{rev[i]:,.0f}</title></rect>")
+        parts.append(f"<text x='{x + bar_w / 2:.1f}' y='{pad_t + plot_h + 16}' text-anchor='middle'>"
+                     f"Y{proj['Year'].iloc[i]}</text>")
+        cy = pad_t + plot_h - (pct[i] - pct_lo) / (pct_hi - pct_lo) * plot_h
+        points.append((x + bar_w / 2, cy))
+
+    parts.append("<polyline fill='none' stroke='#2980b9' stroke-width='2' points='"
+                 + " ".join(f"{x:.1f},{y:.1f}" for x, y in points) + "'/>")
+    for (x, y), v in zip(points, pct):
+        parts.append(f"<circle cx='{x:.1f}' cy='{y:.1f}' r='3.5' fill='#2980b9'/>")
+        parts.append(f"<text x='{x:.1f}' y='{y - 8:.1f}' text-anchor='middle' fill='#2980b9'>{v:.1f}%</text>")
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def render_report(name, inputs, proj, outcome, insights, generated=None):
+    irr = outcome["irr"]
+    irr_text = "N/A" if np.isnan(irr) else f"{irr * 100:.2f}%"
+    roi = outcome["roi"]
+    roi_text = "N/A" if np.isnan(roi) else f"{roi * 100:.2f}%"
+    kpis = [
+        ("Terminal Value", f"₹{outcome['terminal_value']:,.0f}"),
+        ("Investor Payout", f"₹{outcome['payout']:,.0f}"),
+        ("ROI", roi_text),
+        ("IRR", irr_text),
+        ("DCF Valuation", f"₹{outcome['dcf_value']:,.0f}"),
+    ]
+    input_rows = "".join(
+        f"<tr><th style='text-align:left'>{html.escape(k)}</th><td>{v:,.2f}</td></tr>"
+        for k, v in normalize_inputs(inputs).items()
+    )
+    table = proj.to_html(index=False, float_format=lambda v: f"{v:,.2f}", border=0)
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Investor Report — {html.escape(name)}</title>
+<style>{REPORT_CSS}</style></head>
+<body>
+<h1>Investor Report — {html.escape(name)}</h1>
+<div>Generated {generated or f"{datetime.now():%Y-%m-%d %H:%M}"}</div>
+<h2>Investor Outcome</h2>
+<div class="kpis">{"".join(f"<div class='kpi'>{k}<br/>{v}</div>" for k, v in kpis)}</div>
+<h2>Revenue + EBITDA% Projection</h2>
+{projection_svg(proj)}
+<h2>Projection Table</h2>
+{table}
+<h2>Automated Insights</h2>
+{"".join(f"<div class='card'><b>Insight {i}.</b> {html.escape(t)}</div>" for i, t in enumerate(insights, start=1))}
+<h2>Projection Inputs</h2>
+<table>{input_rows}</table>
+</body></html>"""
+
+
+# =========================================================
+# BACKGROUND REPORT WORKER
+# =========================================================
+# Cached HTML carries this marker; each build stamps the current time over it
+GENERATED_MARKER = "<!--generated-at-->"
+
+
+@lru_cache(maxsize=256)
+def _cached_report(name, key, db_path, inputs_items):
+    # Keyed by the input hash: identical scenarios reuse the rendered HTML,
+    # and the projection tables come from the scenario store's result cache.
+    inputs = dict(inputs_items)
+    proj, outcome = ScenarioStore(db_path).results(inputs)
+    return render_report(name, inputs, proj, outcome, investor_insights(inputs, outcome), GENERATED_MARKER)
+
+
+def build_report(name, inputs, db_path=None):
+    inputs = normalize_inputs(inputs)
+    db_path = db_path or ScenarioStore().path
+    body = _cached_report(name, input_hash(inputs), db_path, tuple(sorted(inputs.items())))
+    return body.replace(GENERATED_MARKER, f"{datetime.now():%Y-%m-%d %H:%M}", 1)
+
+
+class ReportWorker:
+
+    def __init__(self, max_workers=REPORT_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+
+    def submit(self, name, inputs, db_path=None):
+        return self._pool.submit(build_report, name, inputs, db_path)
+
+    def submit_batch(self, scenarios, db_path=None):
+        # scenarios: {name: inputs} → {name: Future}, rendered in parallel
+        return {name: self.submit(name, inputs, db_path) for name, inputs in scenarios.items()}
+
+
+def zip_reports(reports):
+    # {name: html} → zip bytes
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, body in reports.items():
+            safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name) or "report"
+            zf.writestr(f"{safe}.html", body)
+    return buf.getvalue()
+
+
+_WORKER = None
+_WORKER_LOCK = threading.Lock()
+
+
+def get_report_worker():
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is None:
+            _WORKER = ReportWorker()
+        return _WORKER
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import pandas as pd
+
+from finance import PROJECTION_INPUTS, projection_table
+
+# =========================================================
+# SCENARIO STORE (SQLITE) + INPUT-HASH RESULT CACHE
+# =========================================================
+DEFAULT_DB_PATH = os.environ.get(
+    "SCENARIO_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios.db")
+)
+DEFAULT_MAX_RESULTS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    name        TEXT PRIMARY KEY,
+    inputs      TEXT NOT NULL,
+    input_hash  TEXT NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    input_hash  TEXT PRIMARY KEY,
+    payload     TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    last_used   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used);
+"""
+
+
+def normalize_inputs(inputs):
+    # Only projection inputs, as plain floats (years as int), so equal scenarios hash equally
+    out = {}
+    for key in PROJECTION_INPUTS:
+        value = inputs[key]
+        out[key] = int(value) if key == "years" else round(float(value), 10)
+    return out
+
+
+def input_hash(inputs):
+    blob = json.dumps(normalize_inputs(inputs), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ScenarioStore:
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_results=DEFAULT_MAX_RESULTS):
+        self.path = path
+        self.max_results = max_results
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across Streamlit threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # ------------------------------
+    # Named scenarios
+    # ------------------------------
+    def save(self, name, inputs):
+        inputs = normalize_inputs(inputs)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scenarios (name, inputs, input_hash, updated_at) VALUES (?, ?, ?, ?)",
+                (name, json.dumps(inputs), input_hash(inputs), time.time())
+            )
+
+    def load(self, name):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT inputs FROM scenarios WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, name):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM scenarios WHERE name = ?", (name,))
+
+    def names(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT name FROM scenarios ORDER BY updated_at DESC").fetchall()
+        return [r[0] for r in rows]
+
+    # ------------------------------
+    # Result cache (LRU by last_used)
+    # ------------------------------
+    def results(self, inputs):
+        # Returns (projection table, outcome summary); computes and caches on a miss
+        key = input_hash(inputs)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT payload FROM results WHERE input_hash = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE results SET last_used = ? WHERE input_hash = ?", (now, key))
+                payload = json.loads(row[0])
+                return pd.DataFrame(payload["projection"]), payload["outcome"]
+
+        proj, outcome = projection_table(**normalize_inputs(inputs))
+        payload = json.dumps({"projection": proj.to_dict(orient="list"), "outcome": outcome})
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (input_hash, payload, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            self._evict(conn)
+        return proj, outcome
+
+    def _evict(self, conn):
+        conn.execute(
+            "DELETE FROM results WHERE input_hash IN ("
+            " SELECT input_hash FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_results,)
+        )
+
+    def compare(self, names):
+        # Side-by-side outcome table for stored scenarios, served from the result cache
+        rows = []
+        for name in names:
+            inputs = self.load(name)
+            if inputs is None:
+                continue
+            _, outcome = self.results(inputs)
+            rows.append({
+                "Scenario": name,
+                "Base Revenue (₹)": inputs["base_rev"],
+                "YoY Growth %": inputs["growth_pct"],
+                "Years": inputs["years"],
+                "Terminal Value (₹)": outcome["terminal_value"],
+                "Investor Payout (₹)": outcome["payout"],
+                "ROI %": outcome["roi"] * 100,
+                "IRR %": outcome["irr"] * 100,
+                "DCF Valuation (₹)": outcome["dcf_value"],
+            })
+        return pd.DataFrame(rows)
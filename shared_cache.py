@@ -0,0 +1,133 @@
+import hashlib
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+# =========================================================
+# PROCESS-WIDE SHARED DATASET CACHE
+# =========================================================
+# Every Streamlit session in this server process shares one copy of each
+# dataset. Entries are content-addressed (hash of the uploaded bytes plus the
+# transformation applied), reference-counted through leases, and evicted in
+# LRU order once the global memory budget is exceeded. Frames are treated as
+# read-only: sessions filter/derive from them and never assign into them.
+DEFAULT_BUDGET_MB = float(os.environ.get("DATASET_CACHE_MB", "4096"))
+
+
+def content_key(data, *parts):
+    digest = hashlib.sha256(data).hexdigest()
+    return ":".join([digest] + [str(p) for p in parts])
+
+
+def private_cache_dir(path):
+    # Created owner-only; an existing directory must belong to this user and is re-restricted
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"Cache directory {path} is owned by another user")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def frame_nbytes(value):
+    # DataFrames, or tuples/dicts of them (e.g. a frame plus its validation report)
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, dict):
+        return sum(frame_nbytes(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(frame_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class Lease:
+    # Holds one reference to a cache entry; dropping the lease (or the session
+    # that stored it) releases the reference.
+
+    def __init__(self, cache, key, frame):
+        self.key = key
+        self.frame = frame
+        self._finalizer = weakref.finalize(self, cache.release, key)
+
+    def release(self):
+        self._finalizer()
+
+
+class DatasetCache:
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries = OrderedDict()   # key → {"frame", "nbytes", "refs"}
+        self._building = {}             # key → Event, so concurrent misses build once
+        self._lock = threading.Lock()
+
+    def acquire(self, key, builder):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["refs"] += 1
+                    self._entries.move_to_end(key)
+                    return Lease(self, key, entry["frame"])
+                pending = self._building.get(key)
+                if pending is None:
+                    pending = self._building[key] = threading.Event()
+                    break
+            # Another session is building the same dataset; wait for it
+            pending.wait()
+
+        try:
+            frame = builder()
+        except Exception:
+            with self._lock:
+                self._building.pop(key).set()
+            raise
+
+        with self._lock:
+            self._entries[key] = {"frame": frame, "nbytes": frame_nbytes(frame), "refs": 1}
+            self._building.pop(key).set()
+            self._evict()
+            return Lease(self, key, frame)
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["refs"] > 0:
+                entry["refs"] -= 1
+            self._evict()
+
+    def _evict(self):
+        # LRU over unreferenced entries only; in-use frames are never dropped
+        used = sum(e["nbytes"] for e in self._entries.values())
+        for key in list(self._entries):
+            if used <= self.budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry["refs"] == 0:
+                used -= entry["nbytes"]
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(e["nbytes"] for e in self._entries.values()),
+                "budget_bytes": self.budget_bytes,
+                "in_use": sum(1 for e in self._entries.values() if e["refs"] > 0),
+            }
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_dataset_cache():
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = DatasetCache()
+        return _CACHE
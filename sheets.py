@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+
+from shared_cache import private_cache_dir
+
+# =========================================================
+# GOOGLE SHEET FETCHER (ASYNC, POOLED, CONDITIONAL, RETRYING)
+# =========================================================
+# Per-user 0700 directory: cached bodies are served as sheet data, so no other
+# local user may be able to create or plant entries in it
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SHEET_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                 "edtech_sheets")
+)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SheetFetchError(Exception):
+    pass
+
+
+def sheet_csv_url(link):
+    # https://docs.google.com/spreadsheets/d/<id>/edit... → CSV export URL
+    try:
+        sheet_id = link.split("/d/")[1].split("/")[0]
+    except IndexError:
+        raise SheetFetchError("Not a Google Sheet link (expected .../spreadsheets/d/<id>/...).")
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+
+
+class SheetFetcher:
+    # One long-lived event loop thread owns one pooled AsyncClient, so
+    # connections are reused across Streamlit reruns and sessions.
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, timeout=30.0, retries=3, backoff=0.5,
+                 max_age=60.0, max_connections=10):
+        self.cache_dir = private_cache_dir(cache_dir)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_age = max_age
+        self.max_connections = max_connections
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="sheet-fetcher", daemon=True)
+        self._thread.start()
+        self._client = asyncio.run_coroutine_threadsafe(self._make_client(), self._loop).result()
+
+    async def _make_client(self):
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            follow_redirects=True
+        )
+
+    # ------------------------------
+    # On-disk response cache
+    # ------------------------------
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.body"), os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_cache(self, url):
+        body_path, meta_path = self._paths(url)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None, {}
+        with open(meta_path, "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        with open(body_path, "rb") as fh:
+            return fh.read(), meta
+
+    def _write_cache(self, url, body, meta):
+        body_path, meta_path = self._paths(url)
+        for path, data, mode in [(body_path, body, "wb"), (meta_path, json.dumps(meta).encode("utf-8"), "wb")]:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, mode) as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+
+    def _touch_cache(self, url, meta):
+        meta = dict(meta, fetched_at=time.time())
+        _, meta_path = self._paths(url)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, meta_path)
+
+    # ------------------------------
+    # Fetching
+    # ------------------------------
+    async def fetch(self, url):
+        # Returns (body bytes, source) where source is "cache", "not-modified" or "network"
+        cached, meta = self._read_cache(url)
+        if cached is not None and time.time() - meta.get("fetched_at", 0) < self.max_age:
+            return cached, "cache"
+
+        headers = {}
+        if cached is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                resp = await self._client.get(url, headers=headers)
+                if resp.status_code == 304 and cached is not None:
+                    self._touch_cache(url, meta)
+                    return cached, "not-modified"
+                if resp.status_code in RETRY_STATUSES:
+                    last_error = SheetFetchError(f"HTTP {resp.status_code} from sheet export")
+                else:
+                    resp.raise_for_status()
+                    body = resp.content
+                    self._write_cache(url, body, {
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                        "fetched_at": time.time(),
+                    })
+                    return body, "network"
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                last_error = e
+            except httpx.HTTPStatusError as e:
+                raise SheetFetchError(f"HTTP {e.response.status_code} from sheet export") from e
+
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+
+        # Network is unavailable: a stale cached copy is better than nothing
+        if cached is not None:
+            return cached, "cache"
+        raise SheetFetchError(f"Sheet fetch failed after {self.retries + 1} attempts: {last_error}")
+
+    async def fetch_many(self, urls):
+        return await asyncio.gather(*(self.fetch(u) for u in urls), return_exceptions=True)
+
+    def fetch_sync(self, url):
+        # Blocking entry point for the Streamlit script thread
+        future = asyncio.run_coroutine_threadsafe(self.fetch(url), self._loop)
+        return future.result(timeout=(self.timeout + self.backoff * 2 ** self.retries) * (self.retries + 1))
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_FETCHER = None
+_FETCHER_LOCK = threading.Lock()
+
+
+def get_sheet_fetcher():
+    global _FETCHER
+    with _FETCHER_LOCK:
+        if _FETCHER is None:
+            _FETCHER = SheetFetcher()
+        return _FETCHER
@@ -0,0 +1,136 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# MERGEABLE QUANTILE SKETCHES (LOG-BUCKET, RELATIVE ERROR)
+# =========================================================
+# Values are mapped to logarithmic buckets of width gamma = (1 + α) / (1 − α), so
+# any quantile is answered within relative error α (DDSketch-style). A sketch is
+# just bucket counts, so merging chunks, periods or groups is an exact sum and
+# the result does not depend on merge order. Sketches are kept per
+# (month, group), so any filter that selects whole months is a merge of rows.
+SKETCH_ALPHA = float(os.environ.get("SKETCH_ALPHA", "0.01"))
+SKETCH_VALUE_COLS = ["collected_amount", "total_fee", "pending_amount"]
+SKETCH_GROUP_COLS = ["campaign_name", "batch"]
+SKETCH_CHUNK_ROWS = 1_000_000
+SKETCH_QUANTILES = [0.25, 0.5, 0.75, 0.9, 0.99]
+MIN_MAGNITUDE = 1e-2      # |value| below this is counted in the zero bucket
+KEY_OFFSET = 1 << 20      # keeps every non-zero key away from 0 so keys sort like values
+ALL_GROUPS = "All"
+
+
+def sketch_keys(values, alpha=SKETCH_ALPHA):
+    # value → signed integer bucket key; keys are monotone in the value
+    v = np.asarray(values, dtype=float)
+    mag = np.abs(v)
+    big = mag >= MIN_MAGNITUDE
+    log_gamma = np.log((1 + alpha) / (1 - alpha))
+    k = np.zeros(len(v), dtype=np.int64)
+    k[big] = np.ceil(np.log(mag[big]) / log_gamma).astype(np.int64) + KEY_OFFSET
+    return np.where(v < 0, -k, k)
+
+
+def key_values(keys, alpha=SKETCH_ALPHA):
+    # Bucket key → representative value (within α of every value in the bucket)
+    keys = np.asarray(keys, dtype=np.int64)
+    gamma = (1 + alpha) / (1 - alpha)
+    mag = 2 * gamma ** (np.abs(keys) - KEY_OFFSET).astype(float) / (gamma + 1)
+    return np.where(keys == 0, 0.0, np.sign(keys) * mag)
+
+
+def _month_index(df):
+    return (df["year"].to_numpy(dtype=np.int64) - 1970) * 12 + df["month"].to_numpy(dtype=np.int64) - 1
+
+
+class SketchCube:
+    # For every (value column, group column) pair: a sparse table of
+    # (period, group, key) → count, sum. The sum is exact, so means are exact too.
+
+    def __init__(self, value_cols=SKETCH_VALUE_COLS, group_cols=SKETCH_GROUP_COLS, alpha=SKETCH_ALPHA):
+        self.value_cols = list(value_cols)
+        self.group_cols = [None] + list(group_cols)
+        self.alpha = alpha
+        self.tables = {}
+
+    def update(self, chunk):
+        # Adds one chunk (needs year / month plus any of the value and group columns)
+        period = _month_index(chunk)
+        for value_col in self.value_cols:
+            if value_col not in chunk.columns:
+                continue
+            values = chunk[value_col].to_numpy(dtype=float)
+            ok = np.isfinite(values)
+            keys = sketch_keys(values[ok], self.alpha)
+            for group_col in self.group_cols:
+                if group_col is not None and group_col not in chunk.columns:
+                    continue
+                # Group on integer codes; labels are attached once per aggregated row
+                if group_col is None:
+                    codes, labels = np.zeros(len(chunk), dtype=np.int64), np.array([ALL_GROUPS], dtype=object)
+                else:
+                    codes, labels = pd.factorize(chunk[group_col].fillna("Unassigned").astype(str))
+                part = pd.DataFrame({
+                    "period": period[ok],
+                    "group": codes[ok],
+                    "key": keys,
+                    "sum": values[ok],
+                }).groupby(["period", "group", "key"], sort=False)["sum"].agg(["count", "sum"])
+                level = part.index.levels[1]
+                part.index = part.index.set_levels(np.asarray(labels, dtype=object)[level], level="group")
+                self._add((value_col, group_col), part)
+        return self
+
+    def memory_usage(self, deep=True):
+        # Lets the shared dataset cache account for the sketch like a frame
+        return int(sum(t.memory_usage(deep=deep).sum() for t in self.tables.values()))
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError("Sketches with different accuracy (alpha) cannot be merged.")
+        for name, table in other.tables.items():
+            self._add(name, table)
+        return self
+
+    def _add(self, name, part):
+        current = self.tables.get(name)
+        if current is None:
+            self.tables[name] = part
+        else:
+            self.tables[name] = pd.concat([current, part]).groupby(level=[0, 1, 2], sort=False).sum()
+
+    def quantiles(self, value_col, group_col=None, periods=None, qs=SKETCH_QUANTILES):
+        # One row per group: count, exact mean, and each requested quantile (within α)
+        columns = ["Group", "Count", "Mean"] + [f"P{q * 100:g}" for q in qs]
+        table = self.tables.get((value_col, group_col))
+        if table is None:
+            return pd.DataFrame(columns=columns)
+        if periods is not None:
+            table = table[table.index.get_level_values("period").isin(np.asarray(periods))]
+        agg = table.groupby(level=["group", "key"], sort=True).sum().reset_index()
+        if agg.empty:
+            return pd.DataFrame(columns=columns)
+
+        by_group = agg.groupby("group", sort=True)
+        cum = by_group["count"].cumsum().to_numpy()
+        total = by_group["count"].transform("sum").to_numpy()
+        out = pd.DataFrame({
+            "Group": by_group["count"].sum().index,
+            "Count": by_group["count"].sum().to_numpy(),
+            "Mean": (by_group["sum"].sum() / by_group["count"].sum()).to_numpy(),
+        })
+        for q, name in zip(qs, columns[3:]):
+            # First bucket whose cumulative count passes the rank q × (n − 1)
+            hit = cum > q * (total - 1)
+            first = agg.loc[hit].groupby("group", sort=True)["key"].first()
+            out[name] = key_values(first.reindex(out["Group"]).to_numpy(), self.alpha)
+        return out.sort_values("Count", ascending=False, ignore_index=True)
+
+
+def build_sketches(df, chunk_rows=SKETCH_CHUNK_ROWS, alpha=SKETCH_ALPHA):
+    # Streams the ledger through the sketch one chunk at a time
+    cube = SketchCube(alpha=alpha)
+    for start in range(0, len(df), chunk_rows):
+        cube.update(df.iloc[start:start + chunk_rows])
+    return cube
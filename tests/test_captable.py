@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from captable import DEFAULT_ROUNDS, ROUND_COLUMNS, build_cap_table, waterfall
+
+
+def _rounds(participating=False):
+    rounds = DEFAULT_ROUNDS.copy()
+    rounds["participating"] = participating
+    return rounds
+
+
+@pytest.mark.parametrize("rounds", [
+    DEFAULT_ROUNDS,
+    _rounds(participating=True),
+    pd.DataFrame([
+        ["Seed", 2e6, 8e6, 10.0, 1.0, False],
+        ["Series A", 10e6, 40e6, 12.0, 2.0, False],
+        ["Series B", 30e6, 150e6, 0.0, 1.0, True],
+        ["Series C", 50e6, 200e6, 5.0, 1.5, False],
+    ], columns=ROUND_COLUMNS),
+])
+def test_payouts_are_monotone_and_sum_to_exit(rounds):
+    cap_table = build_cap_table(rounds)
+    exits = np.linspace(0, 2e9, 100_001)
+    payouts = waterfall(cap_table, exits).to_numpy()
+    assert (np.diff(payouts, axis=0) >= -1e-6).all()
+    np.testing.assert_allclose(payouts.sum(axis=1), exits, rtol=1e-9, atol=1e-6)
+
+
+def test_exact_conversion_price_is_continuous():
+    # With the default rounds the Seed series is indifferent to converting at a 100M exit
+    cap_table = build_cap_table(DEFAULT_ROUNDS)
+    payouts = waterfall(cap_table, [1e8 - 1, 1e8, 1e8 + 1])
+    seed = payouts["Seed"].to_numpy()
+    assert seed[0] <= seed[1] <= seed[2]
+    assert seed[1] > 15e6
+    np.testing.assert_allclose(payouts.sum(axis=1), payouts.index, rtol=1e-12)
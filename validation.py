@@ -0,0 +1,147 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# LEDGER CSV READING (SHARED BY THE DASHBOARDS AND PORTFOLIO MODE)
+# =========================================================
+def read_ledger_csv(data):
+    raw = pd.read_csv(io.BytesIO(data))
+    raw.columns = (
+        raw.columns
+        .str.strip()
+        .str.lower()
+        .str.replace(" ", "_")
+    )
+    return raw
+
+
+# =========================================================
+# SCHEMA VALIDATION (ONE VECTORIZED PASS) + BAD-ROW REPORT
+# =========================================================
+DATE_COLS = ["first_payment_date", "lead_created_date"]
+AMOUNT_COLS = ["collected_amount", "total_fee", "pending_amount"]
+
+
+def validate_ledger(raw, today=None, sample_size=50, seed=0):
+    # Coerces every documented column exactly once and evaluates all rules as
+    # boolean columns. Returns (coerced columns, report); preprocessing reuses
+    # the coerced columns, so validation adds no second parse.
+    today = pd.Timestamp(today or pd.Timestamp.today().normalize())
+    n = len(raw)
+    parsed = {}
+    rules = {}
+
+    for col in DATE_COLS:
+        if col not in raw.columns:
+            continue
+        values = pd.to_datetime(raw[col], errors="coerce")
+        parsed[col] = values
+        rules[f"{col}: unparseable date"] = raw[col].notna().to_numpy() & values.isna().to_numpy()
+        rules[f"{col}: future date"] = (values > today).to_numpy()
+
+    if "first_payment_date" in raw.columns:
+        rules["first_payment_date: missing"] = raw["first_payment_date"].isna().to_numpy()
+
+    for col in AMOUNT_COLS:
+        if col not in raw.columns:
+            continue
+        values = pd.to_numeric(raw[col], errors="coerce")
+        parsed[col] = values
+        rules[f"{col}: unparseable amount"] = raw[col].notna().to_numpy() & values.isna().to_numpy()
+        rules[f"{col}: negative amount"] = (values < 0).to_numpy()
+
+    if "pending_amount" in parsed and "total_fee" in parsed:
+        rules["pending_amount > total_fee"] = (parsed["pending_amount"] > parsed["total_fee"]).to_numpy()
+    if "lead_created_date" in parsed and "first_payment_date" in parsed:
+        rules["first payment before lead created"] = (
+            parsed["first_payment_date"] < parsed["lead_created_date"]
+        ).to_numpy()
+
+    # Exact duplicate rows via a 64-bit row hash (no pairwise comparisons).
+    # Documented columns are hashed in their coerced numeric/datetime form, which is
+    # much cheaper than hashing the raw strings; the coerced and the untouched columns
+    # are hashed separately and combined, so the ledger is never copied to do it.
+    row_hash = np.zeros(n, dtype=np.uint64)
+    parts = [pd.DataFrame(parsed, index=raw.index, copy=False), raw.drop(columns=list(parsed))]
+    for part in parts:
+        if len(part.columns):
+            part_hash = pd.util.hash_pandas_object(part, index=False, categorize=False).to_numpy()
+            row_hash = row_hash * np.uint64(0x9E3779B97F4A7C15) ^ part_hash
+    rules["duplicate row"] = pd.Series(row_hash).duplicated().to_numpy()
+
+    names = list(rules)
+    matrix = np.column_stack([rules[k] for k in names]) if names else np.zeros((n, 0), dtype=bool)
+    counts = matrix.sum(axis=0)
+    bad = matrix.any(axis=1)
+
+    summary = pd.DataFrame({
+        "Rule": names,
+        "Rows": counts,
+        "% of Rows": counts / n * 100 if n else np.zeros(len(names)),
+    })
+
+    # Sampled bad rows, labelled with every rule they break
+    bad_idx = np.flatnonzero(bad)
+    if len(bad_idx) > sample_size:
+        bad_idx = np.sort(np.random.default_rng(seed).choice(bad_idx, sample_size, replace=False))
+    sample = raw.iloc[bad_idx].copy()
+    sample.insert(0, "Issues", ["; ".join(np.array(names)[matrix[i]]) for i in bad_idx])
+    sample.insert(0, "Row", bad_idx + 1)
+
+    dropped = int(rules.get("first_payment_date: missing", np.zeros(n, bool)).sum()
+                  + rules.get("first_payment_date: unparseable date", np.zeros(n, bool)).sum())
+    report = {
+        "rows_in": n,
+        "rows_with_issues": int(bad.sum()),
+        "rows_dropped": dropped,
+        "summary": summary,
+        "sample": sample,
+    }
+    return parsed, report
+
+
+# =========================================================
+# DUPLICATE PAYMENT DETECTION (CHUNKED ROW HASHING)
+# =========================================================
+ID_COLUMN_HINTS = ["student_id", "student_name", "student", "email", "phone", "mobile", "lead_id"]
+DEDUP_CHUNK_ROWS = 1_000_000
+
+
+def default_dedup_keys(columns):
+    # Student identifier + payment date + amount, when an identifier column exists
+    ids = [c for c in ID_COLUMN_HINTS if c in columns]
+    if not ids:
+        return []
+    return ids[:1] + [c for c in ["first_payment_date", "collected_amount"] if c in columns]
+
+
+def dedupe_rows(df, key_cols, chunk_rows=DEDUP_CHUNK_ROWS):
+    # Keeps the first occurrence of each key. Rows are hashed chunk by chunk to
+    # 64-bit values; only the sorted array of hashes seen so far is retained,
+    # so memory is 8 bytes per distinct key plus one chunk of temporaries.
+    n = len(df)
+    keep = np.ones(n, dtype=bool)
+    seen = np.empty(0, dtype=np.uint64)
+
+    for start in range(0, n, chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows][key_cols]
+        h = pd.util.hash_pandas_object(chunk, index=False, categorize=False).to_numpy()
+
+        dup = pd.Series(h).duplicated().to_numpy().copy()
+        if len(seen):
+            pos = np.minimum(np.searchsorted(seen, h), len(seen) - 1)
+            dup |= seen[pos] == h
+        keep[start:start + len(h)] = ~dup
+        # Both parts are sorted runs, so the stable (tim)sort is a linear merge
+        seen = np.sort(np.concatenate((seen, np.sort(h[~dup]))), kind="stable")
+
+    dropped = ~keep
+    report = {
+        "key_columns": list(key_cols),
+        "rows_dropped": int(dropped.sum()),
+        "revenue_dropped": float(pd.to_numeric(df["collected_amount"], errors="coerce")[dropped].sum())
+        if "collected_amount" in df.columns else 0.0,
+    }
+    return keep, report